@@ -1,6 +1,16 @@
 from django.contrib import admin 
 from django.contrib.auth.admin import UserAdmin
-from .models import CustomUser, Vendor, MysteryBag, Reservation, NGORequest, Review, NGO, UserLocation
+from .models import CustomUser, Vendor, MysteryBag, Reservation, NGORequest, Review, NGO, UserLocation, LogoUpload
+from .images import variant_urls
+
+
+class LogoUrlsMixin:
+    # A logo uploaded here bypasses core.images, so refresh the stored variant URLs
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if 'logo' in form.changed_data:
+            obj.logo_urls = variant_urls(obj.logo)
+            obj.save(update_fields=['logo_urls'])
 
 # 🔐 Extended Custom User Admin
 class CustomUserAdmin(UserAdmin):
@@ -15,15 +25,16 @@ class CustomUserAdmin(UserAdmin):
 
 # 🏪 Vendor Admin
 @admin.register(Vendor)
-class VendorAdmin(admin.ModelAdmin):
-    list_display = ('name', 'address', 'delivery_available', 'average_rating', 'logo')
-    search_fields = ('name', 'address')
+class VendorAdmin(LogoUrlsMixin, admin.ModelAdmin):
+    list_display = ('name', 'user', 'address', 'delivery_available', 'average_rating', 'logo')
+    search_fields = ('name', 'address', 'user__username', 'user__email')
+    raw_id_fields = ('user',)
     list_filter = ('delivery_available',)
 
 
 # 🧑‍🤝‍🧑 NGO Admin
 @admin.register(NGO)
-class NGOAdmin(admin.ModelAdmin):
+class NGOAdmin(LogoUrlsMixin, admin.ModelAdmin):
     list_display = ('organization_name', 'user', 'region', 'get_phone', 'description', 'created_at')
     search_fields = ('organization_name', 'user__username', 'region')
     list_filter = ('region', 'created_at')
@@ -75,5 +86,13 @@ class UserLocationAdmin(admin.ModelAdmin):
     list_display = ('user', 'name', 'latitude', 'longitude', 'created_at')
     search_fields = ('user__username', 'name')
 
+# 🖼️ Background logo uploads
+@admin.register(LogoUpload)
+class LogoUploadAdmin(admin.ModelAdmin):
+    list_display = ('id', 'vendor', 'ngo', 'status', 'attempts', 'next_attempt_at', 'updated_at')
+    list_filter = ('status',)
+    raw_id_fields = ('vendor', 'ngo')
+    readonly_fields = ('created_at', 'updated_at')
+
 # 🔐 Register Custom User
 admin.site.register(CustomUser, CustomUserAdmin)
@@ -0,0 +1,110 @@
+"""
+Async versions of the busiest read endpoints, routed in place of the DRF views when
+the app is served through asgi.py (see ASYNC_READ_VIEWS). They return the same JSON,
+headers and status codes, but await the database instead of holding a worker thread
+for the round trip.
+
+These are plain Django views: DRF's APIView is sync-only, so authentication, error
+handling and rendering are done here with DRF's own classes.
+"""
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .models import Vendor, MysteryBag, Reservation, Review, NGO
+from .pagination import page_headers
+from .replicas import replica_reads
+from . import cache as response_cache
+from . import fieldsets
+from .cache import cache_response
+from .serializers import VendorSerializer, MysteryBagSerializer, ReviewSerializer, NGOProfileSerializer
+from .views import bag_pages, reservation_pages, my_reservation_data
+
+
+def _render(data, status_code=status.HTTP_200_OK, headers=None):
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+    return HttpResponse(
+        renderer.render(data), status=status_code, headers=headers,
+        content_type=f'{renderer.media_type}; charset=utf-8' if renderer.charset else renderer.media_type,
+    )
+
+
+def _error(exc):
+    headers = {}
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        headers['WWW-Authenticate'] = api_settings.DEFAULT_AUTHENTICATION_CLASSES[0]().authenticate_header(None)
+    detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    return _render(detail, exc.status_code, headers)
+
+
+async def _authenticated_user(request):
+    """Run the configured DRF authenticators; raises NotAuthenticated if none match."""
+    api_request = Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+    user = await sync_to_async(lambda: api_request.user)()
+    if not user or not user.is_authenticated:
+        raise exceptions.NotAuthenticated()
+    return user
+
+
+# ✅ Get all vendors
+@require_GET
+@cache_response(response_cache.VENDORS)
+@replica_reads
+async def get_vendors(request):
+    try:
+        selection = fieldsets.from_request(request, VendorSerializer)
+    except exceptions.APIException as exc:
+        return _error(exc)
+    vendors = [vendor async for vendor in fieldsets.restrict(Vendor.objects.all(), VendorSerializer, selection)]
+    return _render(VendorSerializer(vendors, many=True, selection=selection, context={'request': request}).data)
+
+
+# ✅ Get all active mystery bags
+@require_GET
+@cache_response(response_cache.BAGS, response_cache.VENDORS)
+@replica_reads
+async def get_all_mystery_bags(request):
+    try:
+        selection = fieldsets.from_request(request, MysteryBagSerializer)
+        bags = fieldsets.restrict(
+            MysteryBag.objects.filter(is_active=True), MysteryBagSerializer, selection, also=bag_pages.fields)
+        page, next_cursor = await bag_pages.apaginate(bags, request)
+    except exceptions.APIException as exc:
+        return _error(exc)
+    data = MysteryBagSerializer(page, many=True, selection=selection).data
+    return _render(data, headers=page_headers(request, next_cursor))
+
+
+# ✅ Get current user's reservations
+@require_GET
+async def get_my_reservations(request):
+    try:
+        user = await _authenticated_user(request)
+        reservations = Reservation.objects.filter(user=user).select_related('bag__vendor')
+        page, next_cursor = await reservation_pages.apaginate(reservations, request)
+    except exceptions.APIException as exc:
+        return _error(exc)
+    return _render([my_reservation_data(r) for r in page], headers=page_headers(request, next_cursor))
+
+
+# ⭐ Get reviews for a vendor
+@require_GET
+@cache_response(response_cache.REVIEWS)
+@replica_reads
+async def get_reviews_by_vendor(request, vendor_id):
+    if not await Vendor.objects.filter(id=vendor_id).aexists():
+        return _render({'detail': 'Vendor not found.'}, status.HTTP_404_NOT_FOUND)
+    reviews = Review.objects.filter(vendor_id=vendor_id).select_related('user').order_by('-created_at')
+    return _render(ReviewSerializer([review async for review in reviews], many=True).data)
+
+
+# 🔓 Public NGO directory
+@require_GET
+@cache_response(response_cache.NGOS)
+@replica_reads
+async def public_ngos(request):
+    ngos = [ngo async for ngo in NGO.objects.select_related('user')]
+    return _render(NGOProfileSerializer(ngos, many=True).data)
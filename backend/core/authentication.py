@@ -1,18 +1,74 @@
+from django.conf import settings
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Case, Q, When
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from . import hashing
+from .models import ClaimsUser
 
 User = get_user_model()
 
 class EmailOrUsernameBackend(ModelBackend):
     def authenticate(self, request, username=None, password=None, **kwargs):
-        try:
-            user = User.objects.get(email=username)  # Try email first
-        except User.DoesNotExist:
-            try:
-                user = User.objects.get(username=username)  # Fallback to username
-            except User.DoesNotExist:
-                return None
-
-        if user.check_password(password) and self.user_can_authenticate(user):
+        if username is None or password is None:
+            return None
+
+        # One indexed lookup; an email match still wins over a username match
+        user = User.objects.filter(Q(email=username) | Q(username=username)).order_by(
+            Case(When(email=username, then=0), default=1)).first()
+        if user is None:
+            # Hash anyway so unknown accounts take as long as wrong passwords
+            hashing.make_password(password)
+            return None
+
+        if hashing.check_password(user, password) and self.user_can_authenticate(user):
             return user
         return None
+
+
+# 🎫 Stateless JWT: request.user from token claims, active flag from a short-TTL cache
+
+def _active_key(user_id):
+    return f'auth:active:{user_id}'
+
+
+def is_user_active(user_id):
+    """`is_active` for `user_id`, cached for AUTH_ACTIVE_CACHE_SECONDS; False if the user is gone."""
+    key = _active_key(user_id)
+    active = cache.get(key)
+    if active is None:
+        active = bool(User.objects.filter(pk=user_id).values_list('is_active', flat=True).first())
+        cache.set(key, active, settings.AUTH_ACTIVE_CACHE_SECONDS)
+    return active
+
+
+def forget_user_status(user_id):
+    """Drop the cached active flag so a deactivation or deletion applies on the next request."""
+    cache.delete(_active_key(user_id))
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that trusts the `role` / `is_staff` claims MyTokenObtainPairSerializer
+    puts in the token instead of loading the user row: `request.user` is a ClaimsUser whose
+    other fields load on first access. Only the active flag is checked, through a short-TTL
+    cache. Tokens without those claims fall back to the normal lookup.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN or not all(name in validated_token for name in ClaimsUser.CLAIM_FIELDS):
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        if not is_user_active(user_id):
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return ClaimsUser.from_claims(user_id, validated_token)
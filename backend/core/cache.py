@@ -0,0 +1,141 @@
+import functools
+import hashlib
+import inspect
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from rest_framework.response import Response
+
+from . import replicas
+
+# Namespaces whose version is bumped by the write paths
+VENDORS = 'vendors'
+BAGS = 'bags'
+REVIEWS = 'reviews'
+NGOS = 'ngos'
+ALL_NAMESPACES = (VENDORS, BAGS, REVIEWS, NGOS)
+
+STATS_KEYS = ('respcache:stats:hits', 'respcache:stats:misses')
+PAGE_HEADERS = ('X-Next-Cursor', 'Link')
+
+
+def _cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def _version_key(namespace):
+    return f'respcache:ver:{namespace}'
+
+
+def get_versions(namespaces):
+    cache = _cache()
+    keys = [_version_key(ns) for ns in namespaces]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Seed from the clock, never 0, so a version evicted from the cache can't
+            # fall back to a number that older entries were stored under
+            cache.add(key, int(time.time() * 1000), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump(*namespaces):
+    """Invalidate every cached response that depends on any of `namespaces`."""
+    cache = _cache()
+    for ns in namespaces:
+        key = _version_key(ns)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, int(time.time() * 1000), timeout=None)
+
+
+def _count(key):
+    cache = _cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+def get_stats():
+    values = _cache().get_many(STATS_KEYS)
+    hits, misses = (values.get(key, 0) for key in STATS_KEYS)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / total, 3) if total else 0.0,
+        'versions': dict(zip(ALL_NAMESPACES, get_versions(ALL_NAMESPACES))),
+    }
+
+
+def _lookup(prefix, namespaces, request):
+    """Return `(key, cached_entry_or_None)` and count the hit or miss."""
+    versions = ':'.join(str(v) for v in get_versions(namespaces))
+    url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    key = f'respcache:{prefix}:{versions}:{url}'
+    cached = _cache().get(key)
+    _count(STATS_KEYS[0] if cached is not None else STATS_KEYS[1])
+    return key, cached
+
+
+def _timeout(timeout):
+    return settings.RESPONSE_CACHE_TIMEOUT if timeout is None else timeout
+
+
+def cache_response(*namespaces, timeout=None):
+    """
+    Cache a read-only view's response data under a key built from the current versions
+    of `namespaces` and the request URL. Place it below `@api_view`. Entries expire
+    after `timeout` seconds (RESPONSE_CACHE_TIMEOUT by default) or are evicted LRU-style
+    by the backend; `bump()` makes them unreachable immediately.
+
+    Also works on the `async def` views in core.async_views, which return already
+    rendered JSON; those entries hold the response body instead of `response.data`.
+    """
+    def decorator(view):
+        if inspect.iscoroutinefunction(view):
+            return _async_cached(view, namespaces, timeout)
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            # A user pinned after a write must not get an entry refilled from a lagging replica
+            if request.method != 'GET' or replicas.is_pinned(request):
+                return view(request, *args, **kwargs)
+
+            key, cached = _lookup(view.__name__, namespaces, request)
+            if cached is not None:
+                data, status_code, headers = cached
+                return Response(data, status=status_code, headers=headers)
+
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                headers = {name: response[name] for name in PAGE_HEADERS if response.has_header(name)}
+                _cache().set(key, (response.data, response.status_code, headers), _timeout(timeout))
+            return response
+        return wrapper
+    return decorator
+
+
+def _async_cached(view, namespaces, timeout):
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET' or await replicas.ais_pinned(request):
+            return await view(request, *args, **kwargs)
+
+        key, cached = await sync_to_async(_lookup)(f'async:{view.__name__}', namespaces, request)
+        if cached is not None:
+            content, status_code, headers = cached
+            return HttpResponse(content, status=status_code, headers=headers)
+
+        response = await view(request, *args, **kwargs)
+        if response.status_code == 200:
+            headers = {name: response[name] for name in ('Content-Type',) + PAGE_HEADERS if response.has_header(name)}
+            await _cache().aset(key, (response.content, response.status_code, headers), _timeout(timeout))
+        return response
+    return wrapper
@@ -0,0 +1,77 @@
+"""
+Response compression negotiated from `Accept-Encoding`.
+
+Brotli is used when the client accepts it and the `brotli` package is installed,
+gzip otherwise. Bodies smaller than COMPRESSION_MIN_BYTES are sent as they are,
+because below that size the framing overhead outweighs the saving. Streaming
+responses (core.exports) and bodies that already have an encoding are left alone.
+"""
+import gzip
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+
+def _accepted(header):
+    """`{coding: q}` from an Accept-Encoding header."""
+    codings = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        q = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding:
+            codings[coding.strip().lower()] = q
+    return codings
+
+
+def choose_encoding(header):
+    """'br', 'gzip' or None for an Accept-Encoding header."""
+    codings = _accepted(header)
+    wildcard = codings.get('*', 0.0)
+    available = ['br', 'gzip'] if brotli is not None else ['gzip']
+    ranked = [(codings.get(name, wildcard), -i, name) for i, name in enumerate(available)]
+    q, _, name = max(ranked)
+    return name if q > 0 else None
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(content, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if len(response.content) < settings.COMPRESSION_MIN_BYTES:
+            return response
+
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = encoding
+        # The representation changed, so a strong ETag no longer matches it
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        return response
@@ -0,0 +1,168 @@
+import random
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, Q, Sum
+
+from .models import Counter, CustomUser, Vendor, NGO, MysteryBag, Reservation
+from .rollups import upsert_increment
+
+# Site-wide keys
+USERS = 'users'
+VENDORS = 'vendors'
+NGOS = 'ngos'
+BAGS = 'bags'
+DONATION_BAGS = 'bags:donation'
+ACTIVE_BAGS = 'bags:active'
+RESERVATIONS = 'reservations'
+
+
+def vendor_key(vendor_id, name):
+    return f'vendor:{vendor_id}:{name}'
+
+
+def role_key(role):
+    return f"users:role:{role or 'unknown'}"
+
+
+def incr(key, delta=1):
+    """Add `delta` to one randomly chosen shard of `key`."""
+    if delta:
+        shard = random.randrange(settings.COUNTER_SHARDS)
+        upsert_increment(Counter, {'key': key, 'shard': shard}, value=delta)
+
+
+def get_many(keys):
+    """Current totals for `keys` in one indexed query; missing keys read as 0."""
+    rows = Counter.objects.filter(key__in=keys).values('key').annotate(total=Sum('value'))
+    totals = {row['key']: row['total'] for row in rows}
+    return {key: totals.get(key, 0) for key in keys}
+
+
+def role_counts():
+    """`{role: users}` for every role that has users."""
+    roles = [role for role, _ in CustomUser.ROLE_CHOICES] + ['unknown']
+    totals = get_many([role_key(role) for role in roles])
+    return {role: totals[role_key(role)] for role in roles if totals[role_key(role)]}
+
+
+# 🔧 Write-path hooks
+
+def record_user(user, delta=1):
+    with transaction.atomic():
+        incr(USERS, delta)
+        incr(role_key(user.role), delta)
+
+
+def record_role_change(old_role, new_role):
+    with transaction.atomic():
+        incr(role_key(old_role), -1)
+        incr(role_key(new_role), 1)
+
+
+def record_bag(bag, delta=1):
+    with transaction.atomic():
+        incr(BAGS, delta)
+        incr(vendor_key(bag.vendor_id, 'bags'), delta)
+        if bag.is_donation:
+            incr(DONATION_BAGS, delta)
+        if bag.is_active:
+            incr(ACTIVE_BAGS, delta)
+
+
+def record_reservation(reservation, delta=1):
+    with transaction.atomic():
+        incr(RESERVATIONS, delta)
+        incr(vendor_key(reservation.bag.vendor_id, 'reservations'), delta)
+        if reservation.is_collected:
+            incr(vendor_key(reservation.bag.vendor_id, 'collected'), delta)
+
+
+def forget_reservations(queryset):
+    """Subtract reservations that are about to be deleted (directly or by cascade)."""
+    rows = queryset.values(vendor_id=F('bag__vendor_id')).annotate(
+        n=Count('id'), collected=Count('id', filter=Q(is_collected=True)))
+    with transaction.atomic():
+        for row in rows:
+            incr(RESERVATIONS, -row['n'])
+            incr(vendor_key(row['vendor_id'], 'reservations'), -row['n'])
+            incr(vendor_key(row['vendor_id'], 'collected'), -row['collected'])
+
+
+def forget_bags(queryset):
+    """Subtract bags (and their reservations) that are about to be deleted."""
+    forget_reservations(Reservation.objects.filter(bag__in=queryset))
+    rows = queryset.values('vendor_id').annotate(
+        n=Count('id'), donations=Count('id', filter=Q(is_donation=True)), active=Count('id', filter=Q(is_active=True)))
+    with transaction.atomic():
+        for row in rows:
+            incr(BAGS, -row['n'])
+            incr(DONATION_BAGS, -row['donations'])
+            incr(ACTIVE_BAGS, -row['active'])
+            incr(vendor_key(row['vendor_id'], 'bags'), -row['n'])
+
+
+def forget_user(user):
+    """Subtract a user and everything that cascades from deleting them."""
+    with transaction.atomic():
+        forget_reservations(Reservation.objects.filter(user=user))
+        vendor = Vendor.objects.filter(user=user).first()
+        if vendor:
+            forget_bags(MysteryBag.objects.filter(vendor=vendor))
+            Counter.objects.filter(key__startswith=vendor_key(vendor.id, '')).delete()
+            incr(VENDORS, -1)
+        if NGO.objects.filter(user=user).exists():
+            incr(NGOS, -1)
+        record_user(user, -1)
+
+
+# 🔁 Reconcile
+
+def compute_all():
+    """Exact values for every counter, computed from the source tables."""
+    values = {
+        USERS: CustomUser.objects.count(),
+        VENDORS: Vendor.objects.count(),
+        NGOS: NGO.objects.count(),
+        BAGS: MysteryBag.objects.count(),
+        DONATION_BAGS: MysteryBag.objects.filter(is_donation=True).count(),
+        ACTIVE_BAGS: MysteryBag.objects.filter(is_active=True).count(),
+        RESERVATIONS: Reservation.objects.count(),
+    }
+    for row in CustomUser.objects.values('role').annotate(n=Count('id')):
+        values[role_key(row['role'])] = values.get(role_key(row['role']), 0) + row['n']
+    for row in MysteryBag.objects.values('vendor_id').annotate(n=Count('id')):
+        values[vendor_key(row['vendor_id'], 'bags')] = row['n']
+    for row in Reservation.objects.values(vendor_id=F('bag__vendor_id')).annotate(
+            n=Count('id'), collected=Count('id', filter=Q(is_collected=True))):
+        values[vendor_key(row['vendor_id'], 'reservations')] = row['n']
+        values[vendor_key(row['vendor_id'], 'collected')] = row['collected']
+    return values
+
+
+def _lock_counters():
+    """Hold off counter writes until the transaction ends; reads (the dashboards) carry on."""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(f'LOCK TABLE {connection.ops.quote_name(Counter._meta.db_table)} IN EXCLUSIVE MODE')
+    else:
+        list(Counter.objects.select_for_update().values_list('id', flat=True))
+
+
+def reconcile():
+    """Replace all counters with exact values. Returns `{key: (old, new)}` for keys that drifted."""
+    with transaction.atomic():
+        # Taken before the recount: an incr committing between the recount and the
+        # rewrite below would otherwise be deleted along with the old rows
+        _lock_counters()
+        expected = compute_all()
+        current = dict(Counter.objects.values('key').annotate(total=Sum('value')).values_list('key', 'total'))
+        drift = {
+            key: (current.get(key, 0), expected.get(key, 0))
+            for key in set(current) | set(expected)
+            if current.get(key, 0) != expected.get(key, 0)
+        }
+        Counter.objects.all().delete()
+        Counter.objects.bulk_create(
+            [Counter(key=key, shard=0, value=value) for key, value in expected.items()], batch_size=1000)
+    return drift
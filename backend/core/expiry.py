@@ -0,0 +1,51 @@
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import cache as response_cache, counters
+from .models import MysteryBag
+
+
+def expired_bags(now=None):
+    """
+    Active bags whose pickup window has closed. A bag's window is on the (local) day it
+    was posted, or runs into the next day when `pickup_end` is before `pickup_start`.
+    """
+    now = timezone.localtime(now)
+    today = timezone.make_aware(datetime.combine(now.date(), time.min))
+    yesterday = today - timedelta(days=1)
+    same_day = Q(pickup_end__gte=F('pickup_start'))
+    ended_today = Q(pickup_end__lte=now.time())
+
+    return MysteryBag.objects.filter(is_active=True).filter(
+        Q(date_posted__lt=yesterday)
+        | Q(date_posted__gte=yesterday, date_posted__lt=today) & (same_day | ended_today)
+        | Q(date_posted__gte=today) & same_day & ended_today
+    )
+
+
+def sweep(batch_size=1000, now=None):
+    """
+    Deactivate expired bags `batch_size` rows per UPDATE and return how many were
+    deactivated. Concurrent runs skip rows another run has locked, and the UPDATE
+    re-checks `is_active`, so a row is only ever counted once.
+    """
+    now = now or timezone.now()
+    total = 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                expired_bags(now).select_for_update(skip_locked=True)
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            deactivated = MysteryBag.objects.filter(id__in=ids, is_active=True).update(is_active=False)
+            counters.incr(counters.ACTIVE_BAGS, -deactivated)
+            total += deactivated
+
+    if total:
+        response_cache.bump(response_cache.BAGS)
+    return total
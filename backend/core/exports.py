@@ -0,0 +1,130 @@
+import csv
+import json
+import zlib
+from datetime import date
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import CustomUser, MysteryBag, Reservation, Review
+
+CHUNK_SIZE = 2000
+
+# dataset -> how to read it: columns, and the lookups the common filters map onto
+DATASETS = {
+    'reservations': {
+        'model': Reservation,
+        'fields': [
+            'id', 'reserved_at', 'user_id', 'user__email', 'bag_id', 'bag__title', 'bag__vendor_id',
+            'bag__vendor__name', 'type', 'payment_method', 'price_paid', 'is_collected',
+        ],
+        'date_field': 'reserved_at',
+        'vendor_lookup': 'bag__vendor_id',
+        'type_lookup': lambda value: {'type': value},
+    },
+    'users': {
+        'model': CustomUser,
+        'fields': [
+            'id', 'username', 'email', 'first_name', 'last_name', 'role', 'phone_number',
+            'is_active', 'is_staff', 'date_joined',
+        ],
+        'date_field': 'date_joined',
+        'vendor_lookup': 'vendor_profile__id',
+        'type_lookup': lambda value: {'role': value},
+    },
+    'bags': {
+        'model': MysteryBag,
+        'fields': [
+            'id', 'vendor_id', 'vendor__name', 'title', 'price', 'quantity_available', 'is_donation',
+            'is_active', 'pickup_start', 'pickup_end', 'date_posted',
+        ],
+        'date_field': 'date_posted',
+        'vendor_lookup': 'vendor_id',
+        'type_lookup': lambda value: {'is_donation': value == 'donation'},
+    },
+    'reviews': {
+        'model': Review,
+        'fields': ['id', 'vendor_id', 'vendor__name', 'user_id', 'rating', 'comment', 'created_at'],
+        'date_field': 'created_at',
+        'vendor_lookup': 'vendor_id',
+        'type_lookup': None,
+    },
+}
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+
+def build_queryset(dataset, start=None, end=None, vendor=None, type=None):
+    """
+    `values()` rows for `dataset`, ordered by primary key. `start`/`end` are
+    YYYY-MM-DD strings (inclusive); `type` is a reservation type, user role, or
+    `donation`/`sale` for bags. Raises ValueError for an unknown dataset or bad filter.
+    """
+    spec = DATASETS.get(dataset)
+    if spec is None:
+        raise ValueError(f"Unknown dataset '{dataset}'. Choose one of: {', '.join(DATASETS)}.")
+
+    queryset = spec['model'].objects.all()
+    if start:
+        queryset = queryset.filter(**{f"{spec['date_field']}__date__gte": date.fromisoformat(start)})
+    if end:
+        queryset = queryset.filter(**{f"{spec['date_field']}__date__lte": date.fromisoformat(end)})
+    if vendor:
+        queryset = queryset.filter(**{spec['vendor_lookup']: int(vendor)})
+    if type:
+        if spec['type_lookup'] is None:
+            raise ValueError(f"'{dataset}' can't be filtered by type.")
+        queryset = queryset.filter(**spec['type_lookup'](type))
+
+    return queryset.order_by('id').values(*spec['fields'])
+
+
+def stream(dataset, queryset, output='csv', compress=False):
+    """Yield `queryset` as encoded chunks, reading rows through a server-side cursor."""
+    if output not in FORMATS:
+        raise ValueError(f"Unknown output '{output}'. Choose one of: {', '.join(FORMATS)}.")
+
+    rows = queryset.iterator(chunk_size=CHUNK_SIZE)
+    chunks = _csv_lines(DATASETS[dataset]['fields'], rows) if output == 'csv' else _ndjson_lines(rows)
+    chunks = (line.encode() for line in chunks)
+    return _gzip(chunks) if compress else chunks
+
+
+def filename(dataset, output, compress=False):
+    name = f'{dataset}.{FORMATS[output][1]}'
+    return f'{name}.gz' if compress else name
+
+
+class _Echo:
+    # csv.writer wants a file; hand each formatted line straight back instead of buffering
+    def write(self, value):
+        return value
+
+
+def _csv_lines(fields, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([row[field] for field in fields])
+
+
+def _ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+def _gzip(chunks, flush_every=64 * 1024):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    pending = 0
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        pending += len(chunk)
+        if out:
+            pending = 0
+            yield out
+        elif pending >= flush_every:
+            pending = 0
+            yield compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
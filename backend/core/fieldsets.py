@@ -0,0 +1,154 @@
+"""
+Sparse fieldsets for list endpoints: `?fields=` and `?expand=`.
+
+    ?fields=id,title,price,vendor                -> just those keys, `vendor` as its id
+    ?fields=id,title,price,vendor&expand=vendor  -> `vendor` as the full nested object
+    ?fields=id,title,vendor.name,vendor.logo     -> `vendor` nested with just those keys
+
+With no `?fields=` the serializer's full output is unchanged. In both cases
+`restrict()` narrows the queryset to the columns (`.only()`) and joins
+(`.select_related()`) that the chosen fields read. Columns nobody asked for,
+such as long TextFields, are never fetched.
+
+Serializers opt in with SparseFieldsMixin. A field whose source is not a plain
+model attribute, like a SerializerMethodField or a property, lists the columns
+it reads in `Meta.field_columns`. Otherwise `restrict()` cannot tell which
+columns it needs and leaves all columns loaded.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+from .pagination import _params
+
+
+class SparseFieldsMixin:
+    """Serializer side: `selection=` (from `from_request()`) keeps only the selected fields."""
+
+    def __init__(self, *args, selection=None, **kwargs):
+        self.selection = selection
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.selection is None:
+            return fields
+
+        kept = {}
+        for name, field in fields.items():
+            if name not in self.selection:
+                continue
+            nested = self.selection[name]
+            if isinstance(field, serializers.Serializer):
+                if nested is None:
+                    # Collapsed relation: render the foreign key without loading the row
+                    source = {'source': field.source} if field.source not in (None, name) else {}
+                    field = serializers.PrimaryKeyRelatedField(read_only=True, **source)
+                else:
+                    field.selection = nested
+            kept[name] = field
+        return kept
+
+
+def _names(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+def from_request(request, serializer_class):
+    """
+    Parse `?fields=` / `?expand=` against `serializer_class` into a selection for
+    the serializer and `restrict()`. Returns None (everything) without `?fields=`.
+    Raises ValidationError for names the serializer doesn't have.
+    """
+    params = _params(request)
+    fields = _names(params.get('fields'))
+    if not fields:
+        return None
+    return _select(serializer_class(), fields, _names(params.get('expand')))
+
+
+def _select(serializer, fields, expand, prefix=''):
+    selection, nested_fields, nested_expand, unknown = {}, {}, {}, []
+    for param, names in (('fields', fields), ('expand', expand)):
+        for name in names:
+            head, _, rest = name.partition('.')
+            field = serializer.fields.get(head)
+            is_nested = isinstance(field, serializers.Serializer)
+            if field is None or ((rest or param == 'expand') and not is_nested):
+                unknown.append(prefix + name)
+                continue
+            selection[head] = None
+            if is_nested and (rest or param == 'expand'):
+                nested_fields.setdefault(head, [])
+                nested_expand.setdefault(head, [])
+                if rest:
+                    (nested_fields if param == 'fields' else nested_expand)[head].append(rest)
+
+    if unknown:
+        raise ValidationError({'fields': f"Unknown or non-expandable field(s): {', '.join(unknown)}."})
+
+    for head, names in nested_fields.items():
+        nested = serializer.fields[head]
+        selection[head] = _select(nested, names or list(nested.fields), nested_expand[head], f'{prefix}{head}.')
+    return selection
+
+
+def restrict(queryset, serializer_class, selection=None, also=()):
+    """
+    Add the `select_related()` / `.only()` that serializing with `selection` needs.
+    `also` names extra columns the view reads itself, e.g. the paginator's ordering.
+    """
+    columns, joins = [], []
+    complete = _reads(serializer_class(selection=selection), '', columns, joins)
+    queryset = queryset.select_related(*dict.fromkeys(joins)) if joins else queryset
+    if not complete:
+        return queryset
+    return queryset.only(*dict.fromkeys([*columns, *joins, *also]))
+
+
+def _reads(serializer, prefix, columns, joins):
+    """Collect the ORM paths `serializer` reads; False when some field's columns are unknown."""
+    model = serializer.Meta.model
+    declared = getattr(serializer.Meta, 'field_columns', {})
+    columns.append(prefix + model._meta.pk.name)
+
+    for name, field in serializer.fields.items():
+        if isinstance(field, serializers.Serializer):
+            relation = prefix + field.source.replace('.', '__')
+            joins.append(relation)
+            if not _reads(field, relation + '__', columns, joins):
+                return False
+            continue
+
+        if name in declared:
+            paths = declared[name]
+        elif field.source == '*':
+            return False
+        else:
+            paths = [field.source.replace('.', '__')]
+
+        for path in paths:
+            model_field = _model_field(model, path)
+            if model_field is None:
+                return False
+            if model_field.is_relation and not isinstance(field, serializers.PrimaryKeyRelatedField):
+                return False  # would load the related row per object
+            relations = path.split('__')[:-1]
+            joins.extend(prefix + '__'.join(relations[:i]) for i in range(1, len(relations) + 1))
+            columns.append(prefix + path)
+    return True
+
+
+def _model_field(model, path):
+    """The concrete field `path` ends at, following forward foreign keys; None otherwise."""
+    *relations, last = path.split('__')
+    try:
+        for part in relations:
+            field = model._meta.get_field(part)
+            if not (field.many_to_one or field.one_to_one) or not field.concrete:
+                return None
+            model = field.related_model
+        field = model._meta.get_field(last)
+    except FieldDoesNotExist:
+        return None
+    return field if field.concrete and not field.many_to_many else None
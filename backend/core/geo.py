@@ -0,0 +1,189 @@
+import heapq
+import itertools
+import math
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+from .models import Vendor, MysteryBag
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class VendorGridIndex:
+    """
+    In-process grid index over vendor coordinates.
+
+    Vendors are bucketed into fixed-size lat/lon cells (a geohash-style grid), so radius
+    and k-nearest queries only look at the cells around the query point instead of every
+    vendor. The index is built lazily from the DB, patched in place when a vendor moves,
+    and fully rebuilt after `refresh_seconds` so workers pick up changes made elsewhere.
+
+    Cells hold frozensets that writers replace rather than mutate, so queries take a
+    shallow copy of the maps under the lock and do the distance work outside it.
+    """
+
+    def __init__(self, cell_degrees=0.05, refresh_seconds=300):
+        self.cell_degrees = cell_degrees
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.RLock()
+        self._cells = {}
+        self._points = {}
+        self._built_at = None
+
+    # 🔧 Maintenance
+
+    def rebuild(self):
+        cells, points = defaultdict(set), {}
+        for vendor_id, lat, lon in Vendor.objects.values_list('id', 'latitude', 'longitude'):
+            if lat is not None and lon is not None and math.isfinite(lat) and math.isfinite(lon):
+                points[vendor_id] = (lat, lon)
+                cells[self._cell(lat, lon)].add(vendor_id)
+        with self._lock:
+            self._cells = {cell: frozenset(ids) for cell, ids in cells.items()}
+            self._points = points
+            self._built_at = time.monotonic()
+
+    def upsert(self, vendor_id, lat, lon):
+        with self._lock:
+            if self._built_at is None:
+                return  # Not built yet; the first query loads current coordinates
+            self._discard(vendor_id)
+            self._insert(vendor_id, float(lat), float(lon))
+
+    def remove(self, vendor_id):
+        with self._lock:
+            self._discard(vendor_id)
+
+    def __len__(self):
+        return len(self._points)
+
+    def _ensure_fresh(self):
+        if self._built_at is None or time.monotonic() - self._built_at > self.refresh_seconds:
+            self.rebuild()
+
+    def _cell(self, lat, lon):
+        return (math.floor(lat / self.cell_degrees), math.floor(lon / self.cell_degrees))
+
+    def _insert(self, vendor_id, lat, lon):
+        if lat is None or lon is None or not (math.isfinite(lat) and math.isfinite(lon)):
+            return
+        self._points[vendor_id] = (lat, lon)
+        cell = self._cell(lat, lon)
+        self._cells[cell] = self._cells.get(cell, frozenset()) | {vendor_id}
+
+    def _discard(self, vendor_id):
+        point = self._points.pop(vendor_id, None)
+        if point:
+            cell = self._cell(*point)
+            remaining = self._cells[cell] - {vendor_id}
+            if remaining:
+                self._cells[cell] = remaining
+            else:
+                del self._cells[cell]
+
+    def _snapshot(self):
+        self._ensure_fresh()
+        with self._lock:
+            return dict(self._cells), dict(self._points)
+
+    # 🔎 Queries
+
+    def within(self, lat, lon, radius_km):
+        """Return `[(distance_km, vendor_id), ...]` within `radius_km`, nearest first."""
+        cells, points = self._snapshot()
+        dlat = radius_km / KM_PER_DEGREE
+        dlon = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+        lat_lo, lon_lo = self._cell(lat - dlat, lon - dlon)
+        lat_hi, lon_hi = self._cell(lat + dlat, lon + dlon)
+
+        if (lat_hi - lat_lo + 1) * (lon_hi - lon_lo + 1) > len(cells):
+            candidates = points.keys()
+        else:
+            candidates = [
+                vendor_id
+                for i in range(lat_lo, lat_hi + 1)
+                for j in range(lon_lo, lon_hi + 1)
+                for vendor_id in cells.get((i, j), ())
+            ]
+        hits = [(haversine_km(lat, lon, *points[v]), v) for v in candidates]
+
+        return sorted(hit for hit in hits if hit[0] <= radius_km)
+
+    def nearest(self, lat, lon, k):
+        """Return the `k` nearest `[(distance_km, vendor_id), ...]`, nearest first."""
+        cells, points = self._snapshot()
+        ci, cj = self._cell(lat, lon)
+        best = []  # max-heap of (-distance, vendor_id)
+
+        for ring in itertools.count():
+            # Far from every vendor the rings are mostly empty: once the next ring would
+            # have visited more cells than are occupied, scanning every vendor is cheaper
+            if (2 * ring + 1) ** 2 > len(cells):
+                return heapq.nsmallest(k, ((haversine_km(lat, lon, *p), v) for v, p in points.items()))
+
+            for cell in self._ring_cells(ci, cj, ring):
+                for vendor_id in cells.get(cell, ()):
+                    d = haversine_km(lat, lon, *points[vendor_id])
+                    if len(best) < k:
+                        heapq.heappush(best, (-d, vendor_id))
+                    elif d < -best[0][0]:
+                        heapq.heapreplace(best, (-d, vendor_id))
+
+            # Anything in the next ring is at least `ring` whole cells away
+            if len(best) == k and -best[0][0] <= self._ring_floor_km(lat, ring):
+                return sorted((-d, vendor_id) for d, vendor_id in best)
+
+    def _ring_cells(self, ci, cj, ring):
+        if ring == 0:
+            yield (ci, cj)
+            return
+        for j in range(cj - ring, cj + ring + 1):
+            yield (ci - ring, j)
+            yield (ci + ring, j)
+        for i in range(ci - ring + 1, ci + ring):
+            yield (i, cj - ring)
+            yield (i, cj + ring)
+
+    def _ring_floor_km(self, lat, ring):
+        far_lat = min(abs(lat) + (ring + 2) * self.cell_degrees, 89.9)
+        return ring * self.cell_degrees * KM_PER_DEGREE * math.cos(math.radians(far_lat))
+
+
+vendor_index = VendorGridIndex(
+    cell_degrees=getattr(settings, 'NEARBY_INDEX_CELL_DEGREES', 0.05),
+    refresh_seconds=getattr(settings, 'NEARBY_INDEX_REFRESH_SECONDS', 300),
+)
+
+
+def nearby_active_bags(lat, lon, radius_km=None, k=20):
+    """
+    Return up to `k` `(bag, distance_km)` pairs for active bags, nearest vendor first.
+
+    With `radius_km` only vendors inside the radius are considered; otherwise the
+    k-nearest search widens until it has `k` bags or runs out of vendors.
+    """
+    def active_bags(hits):
+        distances = {vendor_id: d for d, vendor_id in hits}
+        bags = MysteryBag.objects.filter(vendor_id__in=distances, is_active=True).select_related('vendor')
+        return sorted(((bag, distances[bag.vendor_id]) for bag in bags), key=lambda p: (p[1], p[0].id))
+
+    if radius_km is not None:
+        return active_bags(vendor_index.within(lat, lon, radius_km))[:k]
+
+    n_vendors = k
+    while True:
+        hits = vendor_index.nearest(lat, lon, n_vendors)
+        results = active_bags(hits)
+        if len(results) >= k or len(hits) < n_vendors or n_vendors >= len(vendor_index):
+            return results[:k]
+        n_vendors = min(n_vendors * 2, len(vendor_index))
@@ -0,0 +1,67 @@
+"""
+Password hashing for the login and registration paths.
+
+With PASSWORD_HASH_WORKERS = 0 (the default) everything runs inline, exactly as
+`user.check_password()` / `make_password()` would. With N > 0 the PBKDF2 work runs in
+a pool of N processes, so at most N cores hash at once and a login storm queues behind
+the pool instead of taking every request thread's CPU.
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth import hashers
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker(settings_module):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+
+def _executor():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(
+                    max_workers=settings.PASSWORD_HASH_WORKERS,
+                    initializer=_init_worker,
+                    initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'sustaingo_backend.settings'),),
+                )
+    return _pool
+
+
+def shutdown():
+    """Stop the worker processes (they are started again on next use)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+def _run(func, *args):
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        return func(*args)
+    return _executor().submit(func, *args).result(timeout=settings.PASSWORD_HASH_TIMEOUT)
+
+
+def make_password(raw_password):
+    return _run(hashers.make_password, raw_password)
+
+
+def check_password(user, raw_password):
+    """
+    `user.check_password()`, with the hash verified through the pool. A correct password
+    stored with an outdated hasher or work factor is re-hashed and saved, as Django does.
+    """
+    is_correct, must_update = _run(hashers.verify_password, raw_password, user.password)
+    if is_correct and must_update:
+        user.password = make_password(raw_password)
+        user.save(update_fields=['password'])
+    return is_correct
@@ -0,0 +1,80 @@
+import functools
+import os
+import uuid
+
+from cloudinary import CloudinaryResource, uploader
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.module_loading import import_string
+
+# Fixed logo sizes served to clients; URLs for all of them are stored on the row at upload
+LOGO_VARIANTS = {
+    'thumbnail': {'width': 96, 'height': 96, 'crop': 'fill'},
+    'card': {'width': 400, 'height': 300, 'crop': 'fill'},
+    'full': {'width': 1200, 'height': 1200, 'crop': 'limit'},
+}
+
+
+class LogoStorage:
+    """Where logo files go and how a URL for one size of them is built."""
+
+    def upload(self, file, folder):
+        """Store `file` and return the CloudinaryResource to assign to the model's logo field."""
+        raise NotImplementedError
+
+    def url(self, resource, width, height, crop):
+        raise NotImplementedError
+
+
+class CloudinaryLogoStorage(LogoStorage):
+    def __init__(self):
+        # Importing it applies CLOUDINARY_STORAGE to the SDK config, as the file storage does
+        import cloudinary_storage.app_settings  # noqa: F401
+
+    def upload(self, file, folder):
+        if hasattr(file, 'seekable') and file.seekable():
+            file.seek(0)
+        return uploader.upload_resource(file, folder=folder, type='upload', resource_type='image')
+
+    def url(self, resource, width, height, crop):
+        return resource.build_url(
+            width=width, height=height, crop=crop, fetch_format='auto', quality='auto', secure=True)
+
+
+class LocalLogoStorage(LogoStorage):
+    """Stand-in for tests and local development: files under LOGO_LOCAL_ROOT, no network."""
+
+    def __init__(self):
+        self.files = FileSystemStorage(location=settings.LOGO_LOCAL_ROOT, base_url=settings.LOGO_LOCAL_URL)
+
+    def upload(self, file, folder):
+        _, ext = os.path.splitext(getattr(file, 'name', '') or 'logo')
+        public_id = f'{folder}/{uuid.uuid4().hex}'
+        saved = self.files.save(f'{public_id}{ext.lower()}', file)
+        return CloudinaryResource(
+            public_id=public_id, format=ext.lstrip('.').lower() or None, type='upload', resource_type='image',
+            metadata={'path': saved},
+        )
+
+    def url(self, resource, width, height, crop):
+        name = f'{resource.public_id}.{resource.format}' if resource.format else resource.public_id
+        return f'{self.files.url(name)}?w={width}&h={height}&c={crop}'
+
+
+@functools.lru_cache(maxsize=None)
+def get_storage():
+    return import_string(settings.LOGO_STORAGE)()
+
+
+def variant_urls(logo):
+    """`{variant: url}` for every LOGO_VARIANTS entry, or `{}` when there is no logo."""
+    if not logo:
+        return {}
+    storage = get_storage()
+    return {name: storage.url(logo, **size) for name, size in LOGO_VARIANTS.items()}
+
+
+def upload_logo(file, folder):
+    """Upload a logo and return `(logo, logo_urls)` to store on the Vendor / NGO row."""
+    logo = get_storage().upload(file, folder)
+    return logo, variant_urls(logo)
@@ -0,0 +1,190 @@
+"""
+Background logo uploads.
+
+Views call `stage()`: the file is checked to be an image, written to LOGO_STAGING_DIR
+and queued as a LogoUpload row, and the request returns without waiting for storage.
+A worker then re-encodes and downscales the image, uploads it through the configured
+LogoStorage (core.images), and swaps it onto the Vendor / NGO row. Failed attempts are
+retried with exponential backoff. The worker is either the in-process thread that
+`stage()` wakes, or the `process_logo_uploads` command. Either way it must be able to
+read the staging directory.
+"""
+import io
+import logging
+import os
+import threading
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from . import cache as response_cache
+from . import images
+from .models import LogoUpload, NGO, Vendor
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_FORMATS = {'PNG', 'JPEG', 'GIF', 'WEBP'}
+
+
+class InvalidImage(Exception):
+    pass
+
+
+def stage(file, vendor=None, ngo=None):
+    """Validate `file`, copy it to the staging directory and queue it for `vendor` or `ngo`."""
+    try:
+        with Image.open(file) as image:
+            image_format = image.format
+            image.verify()
+    except Exception as e:  # Pillow raises a variety of errors for truncated or hostile files
+        raise InvalidImage('Logo must be a valid image.') from e
+    if image_format not in ALLOWED_FORMATS:
+        raise InvalidImage(f"Logo must be one of: {', '.join(sorted(ALLOWED_FORMATS))}.")
+
+    os.makedirs(settings.LOGO_STAGING_DIR, exist_ok=True)
+    path = os.path.join(settings.LOGO_STAGING_DIR, uuid.uuid4().hex)
+    file.seek(0)
+    with open(path, 'wb') as out:
+        for chunk in file.chunks():
+            out.write(chunk)
+
+    upload = LogoUpload.objects.create(vendor=vendor, ngo=ngo, staged_path=path)
+    transaction.on_commit(worker.wake)
+    return upload
+
+
+def reencode(path):
+    """
+    Downscale to fit LOGO_MAX_DIMENSION and re-encode: PNG when the image has
+    transparency, progressive JPEG otherwise. Returns `(bytes, extension)`.
+    """
+    with Image.open(path) as image:
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((settings.LOGO_MAX_DIMENSION, settings.LOGO_MAX_DIMENSION))
+        out = io.BytesIO()
+        if image.mode in ('RGBA', 'LA') or 'transparency' in image.info:
+            image.convert('RGBA').save(out, 'PNG', optimize=True)
+            return out.getvalue(), 'png'
+        image.convert('RGB').save(out, 'JPEG', quality=85, optimize=True, progressive=True)
+        return out.getvalue(), 'jpg'
+
+
+# 🔁 Worker
+
+def claim_next():
+    """Mark the next due upload as processing and return it (None if there is none)."""
+    now = timezone.now()
+    abandoned = now - timedelta(seconds=settings.LOGO_UPLOAD_STALE_SECONDS)
+    with transaction.atomic():
+        upload = (
+            LogoUpload.objects.select_for_update(skip_locked=True)
+            .filter(Q(status='pending', next_attempt_at__lte=now) | Q(status='processing', updated_at__lt=abandoned))
+            .order_by('next_attempt_at')
+            .first()
+        )
+        if upload:
+            upload.status = 'processing'
+            upload.save(update_fields=['status', 'updated_at'])
+    return upload
+
+
+def process(upload):
+    """Upload one claimed LogoUpload and swap it in, or schedule a retry."""
+    try:
+        content, ext = reencode(upload.staged_path)
+        folder = 'vendor_logos' if upload.vendor_id else 'ngo_logos'
+        logo, logo_urls = images.upload_logo(ContentFile(content, name=f'logo.{ext}'), folder)
+    except Exception as e:
+        logger.warning('Logo upload %s failed (attempt %s): %s', upload.id, upload.attempts + 1, e)
+        _retry_or_fail(upload, e)
+        return
+    _swap(upload, logo, logo_urls)
+
+
+def run_pending(limit=None):
+    """Process due uploads until none are left (or `limit` were handled); returns `{status: count}`."""
+    outcomes = {}
+    while limit is None or sum(outcomes.values()) < limit:
+        upload = claim_next()
+        if upload is None:
+            break
+        process(upload)
+        outcomes[upload.status] = outcomes.get(upload.status, 0) + 1
+    return outcomes
+
+
+def _retry_or_fail(upload, error):
+    upload.attempts += 1
+    upload.last_error = f'{type(error).__name__}: {error}'
+    if upload.attempts >= settings.LOGO_UPLOAD_MAX_ATTEMPTS:
+        upload.status = 'failed'
+        _discard(upload.staged_path)
+    else:
+        upload.status = 'pending'
+        delay = settings.LOGO_UPLOAD_RETRY_SECONDS * 2 ** (upload.attempts - 1)
+        upload.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+    upload.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at', 'updated_at'])
+
+
+def _swap(upload, logo, logo_urls):
+    model, owner = (Vendor, 'vendor') if upload.vendor_id else (NGO, 'ngo')
+    owner_id = upload.vendor_id or upload.ngo_id
+    with transaction.atomic():
+        # Lock the owner row so two uploads for it finishing together apply in order
+        if not list(model.objects.select_for_update().filter(pk=owner_id).values_list('pk', flat=True)):
+            return  # owner deleted; the upload row went with it
+        superseded = LogoUpload.objects.filter(**{owner: owner_id}, status='done', id__gt=upload.id).exists()
+        if not superseded:
+            model.objects.filter(pk=owner_id).update(logo=logo, logo_urls=logo_urls)
+        upload.status = 'done'
+        upload.save(update_fields=['status', 'updated_at'])
+    _discard(upload.staged_path)
+    if owner == 'vendor':
+        response_cache.bump(response_cache.VENDORS, response_cache.BAGS)
+    else:
+        response_cache.bump(response_cache.NGOS)
+
+
+def _discard(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class _Worker:
+    """Daemon thread that drains the queue when woken and every LOGO_UPLOAD_POLL_SECONDS."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def wake(self):
+        if not settings.LOGO_UPLOAD_IN_PROCESS_WORKER:
+            return
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._loop, name='logo-uploads', daemon=True)
+                self.thread.start()
+        self.event.set()
+
+    def _loop(self):
+        while True:
+            self.event.wait(settings.LOGO_UPLOAD_POLL_SECONDS)
+            self.event.clear()
+            try:
+                run_pending()
+            except Exception:
+                logger.exception('Logo upload worker crashed; retrying on next poll')
+            finally:
+                connection.close()
+
+
+worker = _Worker()
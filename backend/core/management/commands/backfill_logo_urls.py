@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from core.images import variant_urls
+from core.models import Vendor, NGO
+
+
+class Command(BaseCommand):
+    help = 'Fills Vendor / NGO logo_urls from their logo with the configured LOGO_STORAGE (URL building only, no uploads)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Rebuild every row, not only rows without URLs')
+
+    def handle(self, *args, **options):
+        for model in (Vendor, NGO):
+            rows = model.objects.exclude(logo__isnull=True).exclude(logo='')
+            if not options['all']:
+                rows = rows.filter(logo_urls={})
+            rows = list(rows.only('id', 'logo'))
+            for row in rows:
+                row.logo_urls = variant_urls(row.logo)
+            model.objects.bulk_update(rows, ['logo_urls'], batch_size=500)
+            self.stdout.write(f'{model.__name__}: {len(rows)} row(s) updated')
+        self.stdout.write(self.style.SUCCESS('Logo URLs backfilled.'))
@@ -0,0 +1,103 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from core import hashing
+
+PASSWORD = 'Bench-pass-2024!'
+
+
+def _p99(values):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000 if ordered else 0.0
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures login and registration throughput with parallel clients, once per '
+        '--hash-workers setting (0 = hash in the request thread), and the p99 of a cheap '
+        'request issued alongside to show whether hashing starves other traffic'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=400, help='Login attempts per run')
+        parser.add_argument('--registrations', type=int, default=100, help='Registrations per run')
+        parser.add_argument('--concurrency', type=int, default=16, help='Parallel client threads')
+        parser.add_argument('--hash-workers', type=int, nargs='+', default=[0, 4],
+                            help='PASSWORD_HASH_WORKERS values to compare')
+        parser.add_argument('--probe-path', default='/api/vendors/', help='Cheap GET timed during each phase')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        accounts = [
+            User.objects.create(username=f'__bench_login_{i}', email=f'bench_login_{i}@example.com',
+                                password=make_password(PASSWORD))
+            for i in range(options['concurrency'])
+        ]
+        rows = []
+        try:
+            for workers in options['hash_workers']:
+                with override_settings(PASSWORD_HASH_WORKERS=workers):
+                    hashing.shutdown()
+                    hashing.make_password('warm-up')  # start the pool before timing
+                    rows.append((workers, 'login', *self.run_phase(
+                        options['logins'], options, lambda client, i: client.post(
+                            '/api/login/', {'username': accounts[i % len(accounts)].email, 'password': PASSWORD},
+                            format='json'))))
+                    rows.append((workers, 'register', *self.run_phase(
+                        options['registrations'], options, lambda client, i: client.post(
+                            '/api/register/', {
+                                'full_name': 'Bench', 'email': f'bench_reg_{workers}_{i}@example.com',
+                                'phone': '000', 'password': PASSWORD, 'confirm_password': PASSWORD,
+                            }, format='json'))))
+                    hashing.shutdown()
+        finally:
+            User.objects.filter(email__startswith='bench_reg_').delete()
+            User.objects.filter(id__in=[a.id for a in accounts]).delete()
+
+        self.stdout.write(f"\n{'hash workers':>12} {'phase':<9} {'req/s':>8} {'p99 ms':>8} {'probe p99 ms':>13} {'errors':>7}")
+        for workers, phase, rps, p99, probe_p99, errors in rows:
+            self.stdout.write(f'{workers:>12} {phase:<9} {rps:>8.1f} {p99:>8.1f} {probe_p99:>13.1f} {errors:>7}')
+
+    def run_phase(self, total, options, send):
+        """Run `total` calls of `send(client, i)`; returns (req/s, p99 ms, probe p99 ms, errors)."""
+        latencies, errors, probe = [], [], []
+        done = threading.Event()
+
+        def call(i):
+            client = APIClient()
+            start = time.perf_counter()
+            try:
+                response = send(client, i)
+                if response.status_code >= 400:
+                    errors.append(response.status_code)
+            finally:
+                latencies.append(time.perf_counter() - start)
+                connection.close()
+
+        def probe_loop():
+            client = APIClient()
+            while not done.is_set():
+                start = time.perf_counter()
+                client.get(options['probe_path'])
+                probe.append(time.perf_counter() - start)
+                time.sleep(0.01)
+            connection.close()
+
+        prober = threading.Thread(target=probe_loop)
+        prober.start()
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            list(pool.map(call, range(total)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        prober.join()
+
+        return total / elapsed, _p99(latencies), _p99(probe), len(errors)
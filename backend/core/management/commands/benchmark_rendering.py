@@ -0,0 +1,72 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core import compression, renderers
+
+DEFAULT_PATHS = ['/api/bags/', '/api/vendors/', '/api/public_ngos/', '/api/admin/bags/', '/api/admin/reservations/']
+
+
+def _median_ms(fn, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+class Command(BaseCommand):
+    help = (
+        'Reports render time and response size for the main list endpoints: stock JSONRenderer, '
+        'FastJSONRenderer and (if msgpack is installed) MessagePack, plus the gzip / brotli '
+        'size and compression time of the JSON body'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--paths', nargs='+', default=DEFAULT_PATHS)
+        parser.add_argument('--page-size', type=int, default=100, help='page_size sent to paginated endpoints')
+        parser.add_argument('--iterations', type=int, default=200, help='Timed renders per measurement')
+        parser.add_argument('--user', help='Staff username for the admin endpoints (default: first staff user)')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        staff = User.objects.filter(is_staff=True)
+        user = staff.filter(username=options['user']).first() if options['user'] else staff.first()
+        if user is None:
+            raise CommandError('Need a staff user for the admin endpoints (see --user).')
+        client = APIClient()
+        client.force_authenticate(user)
+
+        formats = [('json', JSONRenderer()), ('fast json', renderers.FastJSONRenderer())]
+        if renderers.msgpack is not None:
+            formats.append(('msgpack', renderers.MessagePackRenderer()))
+        if renderers.orjson is None:
+            self.stderr.write('orjson is not installed; FastJSONRenderer falls back to JSONRenderer.')
+        encodings = ['gzip'] + (['br'] if compression.brotli is not None else [])
+
+        self.stdout.write(f"\n{'endpoint':<26} {'items':>5} {'format':<10} {'render ms':>9} {'bytes':>9}")
+        for path in options['paths']:
+            with override_settings(RESPONSE_CACHE_TIMEOUT=0):
+                response = client.get(path, {'page_size': options['page_size']})
+            if response.status_code != 200:
+                self.stderr.write(f'{path}: HTTP {response.status_code}, skipped')
+                continue
+            data = response.data
+            items = len(data) if isinstance(data, list) else 1
+
+            body = b''
+            for name, renderer in formats:
+                ms = _median_ms(lambda: renderer.render(data), options['iterations'])
+                rendered = renderer.render(data)
+                body = body or rendered
+                self.stdout.write(f'{path:<26} {items:>5} {name:<10} {ms:>9.3f} {len(rendered):>9}')
+            for encoding in encodings:
+                ms = _median_ms(lambda: compression.compress(body, encoding), options['iterations'])
+                size = len(compression.compress(body, encoding))
+                self.stdout.write(f"{path:<26} {items:>5} {'json+' + encoding:<10} {ms:>9.3f} {size:>9}")
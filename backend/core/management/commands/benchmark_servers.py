@@ -0,0 +1,159 @@
+import http.client
+import itertools
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+DEFAULT_PATHS = ['/api/vendors/', '/api/bags/', '/api/public_ngos/']
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-tests the hot read endpoints under the WSGI (gunicorn, sync DRF views) and ASGI '
+        '(uvicorn, core.async_views) profiles and reports requests/second and p50/p99 latency. '
+        'Starts each server itself, or benchmarks an already running one with --url.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', nargs='+', choices=['wsgi', 'asgi'], default=['wsgi', 'asgi'])
+        parser.add_argument('--url', help='Benchmark this running server instead of starting one')
+        parser.add_argument('--workers', type=int, default=2, help='Server worker processes')
+        parser.add_argument('--threads', type=int, default=8, help='Threads per gunicorn worker (WSGI profile)')
+        parser.add_argument('--concurrency', type=int, default=128, help='Concurrent client connections')
+        parser.add_argument('--requests', type=int, default=5000, help='Measured requests per profile')
+        parser.add_argument('--warmup', type=int, default=200, help='Unmeasured requests sent first')
+        parser.add_argument('--paths', nargs='+', default=DEFAULT_PATHS, help='Paths to cycle through')
+        parser.add_argument('--user', help='Username to mint a JWT for; adds /api/my-reservations/ to the paths')
+        parser.add_argument('--no-response-cache', action='store_true',
+                            help='Run the servers with RESPONSE_CACHE_TIMEOUT=0 so every request reaches the DB')
+
+    def handle(self, *args, **options):
+        paths = list(options['paths'])
+        headers = {}
+        if options['user']:
+            user = get_user_model().objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f"No user named '{options['user']}'.")
+            headers['Authorization'] = f'Bearer {RefreshToken.for_user(user).access_token}'
+            paths.append('/api/my-reservations/')
+
+        results = {}
+        if options['url']:
+            results['server'] = self.run_load(options['url'], paths, headers, options)
+        else:
+            for profile in options['profiles']:
+                port = _free_port()
+                server = self.start_server(profile, port, options)
+                try:
+                    self.wait_until_ready(port, paths[0], server)
+                    results[profile] = self.run_load(f'http://127.0.0.1:{port}', paths, headers, options)
+                finally:
+                    server.terminate()
+                    server.wait(timeout=30)
+
+        self.stdout.write(f"\n{'profile':<8} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for name, r in results.items():
+            self.stdout.write(f"{name:<8} {r['rps']:>9.1f} {r['p50']:>8.1f} {r['p99']:>8.1f} {r['errors']:>7}")
+        if {'wsgi', 'asgi'} <= set(results):
+            wsgi, asgi = results['wsgi'], results['asgi']
+            self.stdout.write(self.style.SUCCESS(
+                f"ASGI vs WSGI: {asgi['rps'] / wsgi['rps']:.2f}x throughput, "
+                f"p99 {asgi['p99']:.1f} ms vs {wsgi['p99']:.1f} ms"
+            ))
+
+    def start_server(self, profile, port, options):
+        env = dict(os.environ)
+        env.pop('ASYNC_READ_VIEWS', None)  # asgi.py turns it on; the WSGI profile must not inherit it
+        if options['no_response_cache']:
+            env['RESPONSE_CACHE_TIMEOUT'] = '0'
+        bind = ['--workers', str(options['workers'])]
+        if profile == 'wsgi':
+            cmd = [sys.executable, '-m', 'gunicorn', 'sustaingo_backend.wsgi:application',
+                   '--bind', f'127.0.0.1:{port}', '--threads', str(options['threads']), *bind]
+        else:
+            cmd = [sys.executable, '-m', 'uvicorn', 'sustaingo_backend.asgi:application',
+                   '--host', '127.0.0.1', '--port', str(port), '--no-access-log', '--log-level', 'warning', *bind]
+        self.stdout.write(f"Starting {profile}: {' '.join(cmd[2:])}")
+        return subprocess.Popen(cmd, cwd=settings.BASE_DIR, env=env)
+
+    def wait_until_ready(self, port, path, server, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'Server exited with code {server.returncode} before becoming ready.')
+            try:
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+                conn.request('GET', path)
+                conn.getresponse().read()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f'Server on port {port} was not ready after {timeout}s.')
+
+    def run_load(self, base_url, paths, headers, options):
+        """Send warm-up then measured GETs over `concurrency` keep-alive connections."""
+        url = urlsplit(base_url)
+        prefix = url.path.rstrip('/')
+        total = options['warmup'] + options['requests']
+        tickets = itertools.count()
+        lock = threading.Lock()
+        spans, errors = [], [0]
+
+        def client():
+            conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=60)
+            while True:
+                with lock:
+                    n = next(tickets)
+                if n >= total:
+                    break
+                start = time.perf_counter()
+                try:
+                    conn.request('GET', prefix + paths[n % len(paths)], headers=headers)
+                    response = conn.getresponse()
+                    response.read()
+                    ok = response.status < 400
+                except (OSError, http.client.HTTPException):
+                    conn.close()
+                    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=60)
+                    ok = False
+                if n >= options['warmup']:
+                    with lock:
+                        spans.append((start, time.perf_counter()))
+                        errors[0] += not ok
+            conn.close()
+
+        threads = [threading.Thread(target=client) for _ in range(options['concurrency'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        latencies = [end - start for start, end in spans]
+        wall = max(end for _, end in spans) - min(start for start, _ in spans)
+        return {
+            'rps': len(latencies) / wall,
+            'p50': statistics.median(latencies) * 1000,
+            'p99': _percentile(latencies, 99) * 1000,
+            'errors': errors[0],
+        }
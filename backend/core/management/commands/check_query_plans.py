@@ -0,0 +1,204 @@
+import random
+import re
+from datetime import time as dtime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+
+from core import expiry, rollups
+from core.models import Vendor, NGO, MysteryBag, Reservation, Review
+from core.views import MyTokenObtainPairSerializer
+
+PLAN_PASSWORD = 'plan-check-password'
+
+# Plan lines that mean "read the whole table": Postgres and SQLite wording
+SEQ_SCAN_PATTERNS = [
+    re.compile(r'Seq Scan on (\w+)'),
+    # SQLite plan rows may be prefixed with "<id> <parent> <notused>"
+    re.compile(r'^(?:\d+ \d+ \d+ )?\W*SCAN (\w+)(?!.*\bUSING\b)', re.MULTILINE),
+]
+
+# (name, principal, method, path, expected full reads). Paths are formatted with the
+# ids of the principals below. Expected full reads are tables the endpoint reads whole
+# by design (whole-table listings and analytics); they are reported, not failed. Lists
+# are only paged on request, so the "page" endpoints ask for one.
+HOT_ENDPOINTS = [
+    ('bag feed page', None, 'get', '/api/bags/?page_size=50', ()),
+    ('bag feed, sparse', None, 'get', '/api/bags/?fields=id,title,price,vendor&page_size=50', ()),
+    ('nearby bags', None, 'get', '/api/bags/nearby/?lat=33.89&lng=35.5', ('core_vendor',)),  # grid index rebuild
+    ('vendors', None, 'get', '/api/vendors/', ('core_vendor',)),
+    ('vendor bags', None, 'get', '/api/vendors/{vendor_id}/bags/', ()),
+    ('vendor reviews', None, 'get', '/api/vendors/{vendor_id}/reviews/', ()),
+    ('public ngos', None, 'get', '/api/public_ngos/', ('core_ngo', 'core_customuser')),  # joined to every NGO's user
+    ('login', None, 'post', '/api/login/', ()),
+    ('profile', 'user', 'get', '/api/profile/', ()),
+    ('my reservations page', 'user', 'get', '/api/my-reservations/?page_size=50', ()),
+    ('vendor profile', 'vendor', 'get', '/api/vendor-profile/', ()),
+    ('vendor my bags', 'vendor', 'get', '/api/vendor-my-bags/', ()),
+    ('vendor dashboard', 'vendor', 'get', '/api/vendor-dashboard-summary/', ()),
+    ('vendor reservations page', 'vendor', 'get', '/api/vendor-reservations/?page_size=50', ()),
+    ('vendor own reviews', 'vendor', 'get', '/api/vendor-reviews/', ()),
+    ('ngo dashboard', 'ngo', 'get', '/api/get_ngo_dashboard_summary/', ()),
+    ('donation bags', 'ngo', 'get', '/api/get_donation_bags/', ()),
+    ('admin dashboard', 'admin', 'get', '/api/admin-dashboard-stats/', ()),
+    ('admin user page', 'admin', 'get', '/api/admin/users/?page_size=50', ()),
+    ('admin bag page', 'admin', 'get', '/api/admin/bags/?page_size=50', ()),
+    ('admin reservation page', 'admin', 'get', '/api/admin/reservations/?page_size=50', ()),
+    ('admin review page', 'admin', 'get', '/api/admin/reviews/?page_size=50', ()),
+    ('reservation analytics', 'admin', 'get', '/api/reservation-analytics/', ('core_dailyreservationstat',)),
+    ('review analytics', 'admin', 'get', '/api/review-analytics/', ('core_dailyreviewstat',)),
+    ('vendor analytics', 'admin', 'get', '/api/vendor-analytics/', ('core_vendor',)),
+    ('user analytics', 'admin', 'get', '/api/user-analytics/', ()),
+    ('bag analytics', 'admin', 'get', '/api/bag-analytics/', ('core_mysterybag', 'core_vendor')),
+]
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Requests the hot endpoints, EXPLAINs every SELECT they run and fails if any of them '
+        'falls back to a sequential scan. With --seed, a large synthetic dataset is inserted '
+        'first; everything is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true', help='Seed a large dataset inside a rolled-back transaction')
+        parser.add_argument('--scale', type=int, default=1, help='Multiplier for the seeded row counts')
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan, not only failures')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                if options['seed']:
+                    self.seed(options['scale'])
+                failures = self.check_plans(options['verbose_plans'])
+                raise _Rollback()
+        except _Rollback:
+            pass
+
+        if failures:
+            raise CommandError(f'{len(failures)} hot query plan(s) regressed to a sequential scan: {", ".join(failures)}')
+        self.stdout.write(self.style.SUCCESS('All hot query plans use indexes.'))
+
+    def principals(self):
+        """One account per role, created if missing (inside the rolled-back transaction)."""
+        User = get_user_model()
+
+        def account(name, **fields):
+            user = User.objects.create(username=f'__plan_{name}__', email=f'plan_{name}@example.com', **fields)
+            user.set_password(PLAN_PASSWORD)
+            user.save(update_fields=['password'])
+            return user
+
+        user = User.objects.filter(reservation__isnull=False, role='user').first() or account('user')
+        vendor = Vendor.objects.filter(mystery_bags__isnull=False).first() or Vendor.objects.create(name='Plan vendor')
+        if vendor.user is None:
+            vendor.user = account('vendor', role='vendor')
+            vendor.save(update_fields=['user'])
+        ngo = NGO.objects.select_related('user').first() or NGO.objects.create(
+            user=account('ngo', role='ngo'), organization_name='Plan NGO', region='Beirut')
+        return {'user': user, 'vendor': vendor.user, 'ngo': ngo.user, 'admin': account('admin', is_staff=True)}, vendor
+
+    def capture(self):
+        """`{endpoint name: ([SELECT statements], expected full reads)}` from requesting each hot endpoint."""
+        principals, vendor = self.principals()
+        login_user = principals['admin']
+        tokens = {
+            role: str(MyTokenObtainPairSerializer.get_token(user).access_token) for role, user in principals.items()
+        }
+        statements = {}
+        client = Client()
+        # No response cache, pins or active-flag cache: every request reaches the database,
+        # and with no replicas every read runs on this connection (and sees the seeded rows)
+        with override_settings(
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+            DATABASE_REPLICAS=[],
+        ):
+            for name, role, method, path, expected in HOT_ENDPOINTS:
+                headers = {'HTTP_AUTHORIZATION': f'Bearer {tokens[role]}'} if role else {}
+                data = {'username': login_user.email, 'password': PLAN_PASSWORD} if method == 'post' else None
+                with CaptureQueriesContext(connection) as queries:
+                    response = getattr(client, method)(path.format(vendor_id=vendor.id), data, **headers)
+                if response.status_code >= 400:
+                    raise CommandError(f'{name}: {method.upper()} {path} returned {response.status_code}')
+                selects = [q['sql'] for q in queries.captured_queries if q['sql'].lstrip().upper().startswith('SELECT')]
+                statements[name] = (list(dict.fromkeys(selects)), set(expected))
+
+        # Not behind a request, but built by the same code the sweeper runs
+        with CaptureQueriesContext(connection) as queries:
+            list(expiry.expired_bags().values_list('id', flat=True)[:1000])
+        statements['expiry sweep batch'] = ([q['sql'] for q in queries.captured_queries], set())
+        return statements
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}')
+            return '\n'.join(' '.join(str(col) for col in row) for row in cursor.fetchall())
+
+    def check_plans(self, verbose):
+        failures = []
+        for name, (selects, expected) in self.capture().items():
+            problems, notes = [], []
+            for sql in selects:
+                plan = self.explain(sql)
+                scanned = {m for p in SEQ_SCAN_PATTERNS for m in p.findall(plan)}
+                if scanned - expected:
+                    problems.append((sql, plan, sorted(scanned - expected)))
+                elif verbose:
+                    notes.append((sql, plan, sorted(scanned)))
+            if problems:
+                failures.append(name)
+                tables = sorted({t for _, _, ts in problems for t in ts})
+                self.stdout.write(self.style.ERROR(f'✗ {name}: sequential scan on {", ".join(tables)}'))
+            else:
+                self.stdout.write(f'✓ {name} ({len(selects)} queries)')
+            for sql, plan, _ in problems + notes:
+                self.stdout.write(f'    {sql}\n      ' + plan.replace('\n', '\n      '))
+        return failures
+
+    def seed(self, scale):
+        User = get_user_model()
+        rng = random.Random(7)
+        now = timezone.now()
+        n_users, n_vendors, n_bags = 2000 * scale, 200 * scale, 20000 * scale
+        n_reservations, n_reviews = 50000 * scale, 20000 * scale
+        self.stdout.write(f'Seeding {n_users} users, {n_bags} bags, {n_reservations} reservations, {n_reviews} reviews...')
+
+        users = User.objects.bulk_create([
+            User(username=f'plan_user_{i}', email=f'plan_user_{i}@example.com',
+                 role=rng.choice(['user', 'user', 'ngo']), date_joined=now - timedelta(hours=6 * i))
+            for i in range(n_users)
+        ], batch_size=1000)
+        vendors = Vendor.objects.bulk_create(
+            [Vendor(name=f'Plan vendor {i}') for i in range(n_vendors)], batch_size=1000)
+        bags = MysteryBag.objects.bulk_create([
+            MysteryBag(
+                vendor=rng.choice(vendors), title='Plan bag', description='', price=5,
+                quantity_available=rng.randint(0, 5), is_donation=rng.random() < 0.1,
+                is_active=rng.random() < 0.05, pickup_start=dtime(17), pickup_end=dtime(20),
+                date_posted=now - timedelta(minutes=i),
+            )
+            for i in range(n_bags)
+        ], batch_size=1000)
+        Reservation.objects.bulk_create([
+            Reservation(user=rng.choice(users), bag=rng.choice(bags), type=rng.choice(['user', 'ngo']),
+                        is_collected=rng.random() < 0.3)
+            for _ in range(n_reservations)
+        ], batch_size=1000)
+        Review.objects.bulk_create([
+            Review(user=rng.choice(users), vendor=rng.choice(vendors), rating=rng.randint(1, 5), comment='')
+            for _ in range(n_reviews)
+        ], batch_size=1000)
+
+        # The analytics endpoints read the rollups, so fill them the way the write paths would
+        rollups.rebuild()
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import expiry
+
+
+class Command(BaseCommand):
+    help = (
+        'Deactivates mystery bags whose pickup window has passed, in batched UPDATEs. '
+        'Nothing else deactivates them: schedule it every 5 minutes (see "Bag expiry" in README.txt). '
+        'Safe to run repeatedly and concurrently.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows per UPDATE')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the bags that would be deactivated')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be a positive integer.')
+
+        if options['dry_run']:
+            count = expiry.expired_bags().count()
+            self.stdout.write(f'{count} expired bag(s) would be deactivated.')
+            return
+
+        count = expiry.sweep(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{count} expired bag(s) deactivated.'))
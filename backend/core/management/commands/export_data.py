@@ -0,0 +1,40 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import exports
+
+
+class Command(BaseCommand):
+    help = 'Streams reservations, users, bags or reviews to CSV / NDJSON in constant memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(exports.DATASETS))
+        parser.add_argument('--output', choices=sorted(exports.FORMATS), default='csv')
+        parser.add_argument('--start', help='First day to include (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last day to include (YYYY-MM-DD)')
+        parser.add_argument('--vendor', type=int, help='Only rows for this vendor id')
+        parser.add_argument('--type', help='Reservation type, user role, or donation/sale for bags')
+        parser.add_argument('--gzip', action='store_true', help='gzip the output')
+        parser.add_argument('--file', help='Write here instead of stdout')
+
+    def handle(self, *args, **options):
+        try:
+            queryset = exports.build_queryset(
+                options['dataset'],
+                start=options['start'],
+                end=options['end'],
+                vendor=options['vendor'],
+                type=options['type'],
+            )
+            chunks = exports.stream(options['dataset'], queryset, output=options['output'], compress=options['gzip'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        target = open(options['file'], 'wb') if options['file'] else sys.stdout.buffer
+        try:
+            for chunk in chunks:
+                target.write(chunk)
+        finally:
+            if options['file']:
+                target.close()
@@ -0,0 +1,27 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import logo_uploads
+
+
+class Command(BaseCommand):
+    help = (
+        'Pushes staged logo uploads to storage and swaps them onto their vendor / NGO. '
+        'Run once from cron, or with --loop as a dedicated worker '
+        '(then set LOGO_UPLOAD_IN_PROCESS_WORKER = False for the web processes).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep polling instead of exiting when the queue is empty')
+
+    def handle(self, *args, **options):
+        while True:
+            outcomes = logo_uploads.run_pending()
+            if outcomes or not options['loop']:
+                summary = ', '.join(f'{n} {status}' for status, n in sorted(outcomes.items())) or 'nothing due'
+                self.stdout.write(f'Logo uploads: {summary}.')
+            if not options['loop']:
+                break
+            time.sleep(settings.LOGO_UPLOAD_POLL_SECONDS)
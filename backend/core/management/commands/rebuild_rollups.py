@@ -0,0 +1,24 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import rollups
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the daily analytics rollup tables from reservations, users and reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Only rebuild days on or after this date (YYYY-MM-DD); default: all history')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError('--since must be a YYYY-MM-DD date.')
+
+        rollups.rebuild(since)
+        scope = f'since {since}' if since else 'for all history'
+        self.stdout.write(self.style.SUCCESS(f'Rollups rebuilt {scope}.'))
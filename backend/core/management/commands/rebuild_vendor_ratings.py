@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from core.models import Vendor, Review
+
+
+class Command(BaseCommand):
+    help = 'Recomputes stored vendor rating aggregates (count, average, 1–5 star histogram) from reviews'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vendor', type=int, action='append', dest='vendor_ids',
+                            help='Only rebuild this vendor id (repeatable)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report drifted vendors without writing')
+
+    def handle(self, *args, **options):
+        vendors = Vendor.objects.only(*Vendor.RATING_STAT_FIELDS)
+        reviews = Review.objects.all()
+        if options['vendor_ids']:
+            vendors = vendors.filter(id__in=options['vendor_ids'])
+            reviews = reviews.filter(vendor_id__in=options['vendor_ids'])
+
+        stats = {}
+        for row in reviews.values('vendor_id', 'rating').annotate(n=Count('id')):
+            stats.setdefault(row['vendor_id'], {})[row['rating']] = row['n']
+
+        with transaction.atomic():
+            drifted = []
+            for vendor in vendors.select_for_update():
+                before = (vendor.review_count, vendor.rating_histogram)
+                vendor.set_rating_histogram(stats.get(vendor.id, {}))
+                if before != (vendor.review_count, vendor.rating_histogram):
+                    drifted.append(vendor)
+
+            if not options['dry_run']:
+                Vendor.objects.bulk_update(drifted, Vendor.RATING_STAT_FIELDS, batch_size=500)
+
+        verb = 'would be updated' if options['dry_run'] else 'updated'
+        self.stdout.write(self.style.SUCCESS(f'{len(drifted)} vendor(s) {verb}.'))
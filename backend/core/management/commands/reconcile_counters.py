@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from core import counters
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the dashboard counters from the source tables and reports any drift'
+
+    def handle(self, *args, **options):
+        drift = counters.reconcile()
+        for key, (old, new) in sorted(drift.items()):
+            self.stdout.write(f'{key}: {old} -> {new}')
+        self.stdout.write(self.style.SUCCESS(f'Counters reconciled, {len(drift)} key(s) corrected.'))
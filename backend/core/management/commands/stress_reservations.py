@@ -0,0 +1,84 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import time as dtime
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core import counters, rollups
+from core.models import Counter, Vendor, MysteryBag, Reservation
+from core.reservations import reserve_bag_for, BagSoldOut
+
+
+class Command(BaseCommand):
+    help = 'Fires parallel reservations at one bag and checks that it never oversells'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=300, help='Total reservation attempts')
+        parser.add_argument('--quantity', type=int, default=100, help='Units available on the bag')
+        parser.add_argument('--workers', type=int, default=32, help='Parallel threads')
+        parser.add_argument('--retries', type=int, default=50,
+                            help='Attempts per request that repeat an earlier idempotency key')
+        parser.add_argument('--keep', action='store_true', help='Keep the generated rows')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        total, quantity, workers = options['requests'], options['quantity'], options['workers']
+        retries = min(options['retries'], total)
+
+        vendor = Vendor.objects.create(name='__stress_vendor__')
+        bag = MysteryBag.objects.create(
+            vendor=vendor, title='Stress bag', description='', price=1,
+            quantity_available=quantity, pickup_start=dtime(0, 0), pickup_end=dtime(23, 59),
+        )
+        counters.record_bag(bag)
+        users = [
+            User.objects.create(username=f'__stress_{bag.id}_{i}', email=f'stress{bag.id}_{i}@example.com')
+            for i in range(workers)
+        ]
+
+        # The last `retries` attempts replay a key already used by an earlier attempt
+        jobs = [(users[i % workers], f'k{i}') for i in range(total - retries)]
+        jobs += [jobs[i] for i in range(retries)]
+
+        def attempt(job):
+            user, key = job
+            try:
+                _, created = reserve_bag_for(user, bag.id, idempotency_key=key)
+                return 'created' if created else 'replayed'
+            except BagSoldOut:
+                return 'sold_out'
+            except Exception as e:
+                return f'error: {type(e).__name__}'
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(attempt, jobs))
+        elapsed = time.perf_counter() - started
+
+        bag.refresh_from_db()
+        reserved = Reservation.objects.filter(bag=bag).count()
+        tally = {o: outcomes.count(o) for o in sorted(set(outcomes))}
+
+        self.stdout.write(f'Outcomes: {tally}')
+        self.stdout.write(f'Reservations: {reserved}, remaining: {bag.quantity_available}, active: {bag.is_active}')
+        self.stdout.write(f'Throughput: {total / elapsed:.1f} req/s over {elapsed:.2f}s with {workers} workers')
+
+        oversold = reserved > quantity or reserved + bag.quantity_available != quantity
+        double_booked = reserved != tally.get('created', 0)
+
+        if not options['keep']:
+            # The bag and the reservations went through the write paths; the vendor was created directly
+            with transaction.atomic():
+                rollups.forget_reservations(Reservation.objects.filter(bag=bag))
+                counters.forget_bags(MysteryBag.objects.filter(id=bag.id))
+                Counter.objects.filter(key__startswith=counters.vendor_key(vendor.id, '')).delete()
+                vendor.delete()
+                User.objects.filter(id__in=[u.id for u in users]).delete()
+
+        if oversold or double_booked:
+            raise CommandError('Inventory check failed: bag oversold or a retry double-booked.')
+        self.stdout.write(self.style.SUCCESS('No oversell, no double booking.'))
@@ -0,0 +1,67 @@
+# Generated by Django 5.2 on 2026-10-18 09:52
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_review_stats(apps, schema_editor):
+    Vendor = apps.get_model('core', 'Vendor')
+    Review = apps.get_model('core', 'Review')
+
+    stats = {}
+    for row in Review.objects.values('vendor_id', 'rating').annotate(n=Count('id')):
+        stats.setdefault(row['vendor_id'], {})[row['rating']] = row['n']
+
+    vendors = list(Vendor.objects.filter(id__in=stats.keys()))
+    for vendor in vendors:
+        histogram = stats[vendor.id]
+        for star in range(1, 6):
+            setattr(vendor, f'rating_{star}_count', histogram.get(star, 0))
+        vendor.review_count = sum(histogram.values())
+        vendor.average_rating = sum(star * n for star, n in histogram.items()) / vendor.review_count
+
+    Vendor.objects.bulk_update(vendors, [
+        'review_count', 'average_rating',
+        'rating_1_count', 'rating_2_count', 'rating_3_count', 'rating_4_count', 'rating_5_count',
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_alter_reservation_payment_method'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vendor',
+            name='rating_1_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='vendor',
+            name='rating_2_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='vendor',
+            name='rating_3_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='vendor',
+            name='rating_4_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='vendor',
+            name='rating_5_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='vendor',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_review_stats, migrations.RunPython.noop),
+    ]
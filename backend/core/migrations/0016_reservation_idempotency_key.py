@@ -0,0 +1,22 @@
+# Generated by Django 5.2 on 2026-10-18 09:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_vendor_review_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='reservation',
+            constraint=models.UniqueConstraint(condition=models.Q(('idempotency_key__isnull', False)), fields=('user', 'idempotency_key'), name='unique_reservation_idempotency_key'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2 on 2026-10-18 09:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def link_vendor_users(apps, schema_editor):
+    """
+    Vendors used to be matched to their account by `user.first_name == vendor.name`.
+    Link every vendor whose name matches exactly one vendor-role user; ambiguous or
+    unmatched vendors stay unlinked and can be fixed in the admin.
+    """
+    Vendor = apps.get_model('core', 'Vendor')
+    User = apps.get_model('core', 'CustomUser')
+
+    users_by_name = {}
+    for user_id, first_name in User.objects.filter(role='vendor').values_list('id', 'first_name'):
+        users_by_name.setdefault(first_name, []).append(user_id)
+
+    vendors_by_name = {}
+    for vendor in Vendor.objects.filter(user__isnull=True):
+        vendors_by_name.setdefault(vendor.name, []).append(vendor)
+
+    linked = []
+    for name, vendors in vendors_by_name.items():
+        user_ids = users_by_name.get(name, [])
+        if len(vendors) == 1 and len(user_ids) == 1:
+            vendors[0].user_id = user_ids[0]
+            linked.append(vendors[0])
+
+    Vendor.objects.bulk_update(linked, ['user'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_reservation_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vendor',
+            name='user',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='vendor_profile', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(link_vendor_users, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2 on 2026-10-18 09:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0017_vendor_user'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['email'], name='user_email_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['-date_joined', '-id'], name='user_joined_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mysterybag',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-date_posted', '-id'], name='bag_active_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mysterybag',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_donation', True), ('quantity_available__gt', 0)), fields=['-date_posted'], name='bag_donation_open_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mysterybag',
+            index=models.Index(fields=['vendor', 'is_active'], name='bag_vendor_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mysterybag',
+            index=models.Index(fields=['-date_posted', '-id'], name='bag_posted_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['user', '-reserved_at', '-id'], name='res_user_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['user', 'type', 'reserved_at'], name='res_user_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['bag', '-reserved_at'], name='res_bag_reserved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['-reserved_at', '-id'], name='res_reserved_page_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(condition=models.Q(('is_collected', True)), fields=['bag'], name='res_collected_bag_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['vendor', '-created_at'], name='review_vendor_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['-created_at', '-id'], name='review_created_page_idx'),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2 on 2026-10-18 10:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_rollups(apps, schema_editor):
+    Reservation = apps.get_model('core', 'Reservation')
+    CustomUser = apps.get_model('core', 'CustomUser')
+    Review = apps.get_model('core', 'Review')
+    DailyReservationStat = apps.get_model('core', 'DailyReservationStat')
+    DailyUserStat = apps.get_model('core', 'DailyUserStat')
+    DailyReviewStat = apps.get_model('core', 'DailyReviewStat')
+
+    DailyReservationStat.objects.bulk_create([
+        DailyReservationStat(**row) for row in Reservation.objects.values(
+            'type', 'payment_method', 'is_collected', day=TruncDate('reserved_at'), vendor_id=F('bag__vendor_id'),
+        ).annotate(count=Count('id'))
+    ], batch_size=1000)
+    DailyUserStat.objects.bulk_create([
+        DailyUserStat(**row)
+        for row in CustomUser.objects.values('role', day=TruncDate('date_joined')).annotate(count=Count('id'))
+    ], batch_size=1000)
+    DailyReviewStat.objects.bulk_create([
+        DailyReviewStat(**row) for row in Review.objects.values('vendor_id', day=TruncDate('created_at')).annotate(
+            count=Count('id'), rating_sum=Sum('rating'))
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyUserStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('role', models.CharField(choices=[('user', 'User'), ('vendor', 'Vendor'), ('ngo', 'NGO')], max_length=10)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'role'), name='unique_daily_user_stat')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyReservationStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('type', models.CharField(choices=[('user', 'User'), ('ngo', 'NGO')], max_length=10)),
+                ('payment_method', models.CharField(choices=[('cash', 'Cash on Delivery'), ('card', 'Credit Card')], max_length=20)),
+                ('is_collected', models.BooleanField()),
+                ('count', models.IntegerField(default=0)),
+                ('vendor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_reservation_stats', to='core.vendor')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'vendor', 'type', 'payment_method', 'is_collected'), name='unique_daily_reservation_stat')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyReviewStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('vendor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_review_stats', to='core.vendor')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'vendor'), name='unique_daily_review_stat')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2 on 2026-10-18 10:01
+
+from django.db import migrations, models
+from django.db.models import Count, F, Q
+
+
+def backfill_counters(apps, schema_editor):
+    get = lambda name: apps.get_model('core', name)
+    MysteryBag, Reservation = get('MysteryBag'), get('Reservation')
+
+    values = {
+        'users': get('CustomUser').objects.count(),
+        'vendors': get('Vendor').objects.count(),
+        'ngos': get('NGO').objects.count(),
+        'bags': MysteryBag.objects.count(),
+        'bags:donation': MysteryBag.objects.filter(is_donation=True).count(),
+        'reservations': Reservation.objects.count(),
+    }
+    for row in MysteryBag.objects.values('vendor_id').annotate(n=Count('id')):
+        values[f"vendor:{row['vendor_id']}:bags"] = row['n']
+    for row in Reservation.objects.values(vendor_id=F('bag__vendor_id')).annotate(
+            n=Count('id'), collected=Count('id', filter=Q(is_collected=True))):
+        values[f"vendor:{row['vendor_id']}:reservations"] = row['n']
+        values[f"vendor:{row['vendor_id']}:collected"] = row['collected']
+
+    Counter = get('Counter')
+    Counter.objects.bulk_create([Counter(key=k, shard=0, value=v) for k, v in values.items()], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Counter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64)),
+                ('shard', models.PositiveSmallIntegerField(default=0)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('key', 'shard'), name='unique_counter_shard')],
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
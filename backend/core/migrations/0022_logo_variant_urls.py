@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 10:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_claims_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ngo',
+            name='logo_urls',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='vendor',
+            name='logo_urls',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-18 10:46
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def rebuild_by_day(apps, schema_editor):
+    # The per-role rows drifted when roles changed; recount sign-ups per day from the users
+    CustomUser = apps.get_model('core', 'CustomUser')
+    DailyUserStat = apps.get_model('core', 'DailyUserStat')
+    DailyUserStat.objects.all().delete()
+    DailyUserStat.objects.bulk_create([
+        DailyUserStat(**row) for row in CustomUser.objects.values(day=TruncDate('date_joined')).annotate(count=Count('id'))
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_logo_uploads'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='dailyuserstat',
+            name='unique_daily_user_stat',
+        ),
+        migrations.RemoveField(
+            model_name='dailyuserstat',
+            name='role',
+        ),
+        migrations.RunPython(rebuild_by_day, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='dailyuserstat',
+            constraint=models.UniqueConstraint(fields=('day',), name='unique_daily_user_stat_day'),
+        ),
+    ]
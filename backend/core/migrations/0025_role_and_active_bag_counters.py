@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-18 14:20
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def backfill_counters(apps, schema_editor):
+    # Users created outside sign-up were never counted but were subtracted on delete;
+    # recount them, and seed the per-role and active-bag counters the analytics now read
+    CustomUser = apps.get_model('core', 'CustomUser')
+    Counter = apps.get_model('core', 'Counter')
+
+    values = {
+        'users': CustomUser.objects.count(),
+        'bags:active': apps.get_model('core', 'MysteryBag').objects.filter(is_active=True).count(),
+    }
+    for row in CustomUser.objects.values('role').annotate(n=Count('id')):
+        key = f"users:role:{row['role'] or 'unknown'}"
+        values[key] = values.get(key, 0) + row['n']
+
+    Counter.objects.filter(key__in=['users', 'bags:active']).delete()
+    Counter.objects.filter(key__startswith='users:role:').delete()
+    Counter.objects.bulk_create([Counter(key=k, shard=0, value=v) for k, v in values.items()], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_daily_user_stat_by_day'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
 from django.conf import settings
 from django.utils import timezone
@@ -16,12 +16,61 @@ class CustomUser(AbstractUser):
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='user')
     phone_number = models.CharField(max_length=20, blank=True, null=True)  # ✅ Added
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['email'], name='user_email_idx'),  # login + register lookups
+            models.Index(fields=['-date_joined', '-id'], name='user_joined_page_idx'),
+        ]
+
     def __str__(self):
         return self.username
 
 
+# 🎫 A CustomUser built from JWT claims (see core.authentication) instead of a query
+class ClaimsUser(CustomUser):
+    CLAIM_FIELDS = ('role', 'is_staff')
+
+    class Meta:
+        proxy = True
+
+    @classmethod
+    def from_claims(cls, user_id, claims):
+        """
+        An instance with only the id, `CLAIM_FIELDS` and is_active (already checked by
+        the caller) loaded. Every other field is deferred; touching any of them loads
+        the whole row once.
+        """
+        loaded = {'id': user_id, 'is_active': True, **{name: claims[name] for name in cls.CLAIM_FIELDS}}
+        names = [f.attname for f in cls._meta.concrete_fields if f.attname in loaded]
+        user = cls.from_db(None, names, [loaded[name] for name in names])
+        user._claims = loaded
+        return user
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        if fields is not None and self.get_deferred_fields():
+            # Lazy load of a deferred field: fetch the full row, replacing the claim values too
+            fields = [f.attname for f in self._meta.concrete_fields]
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
+    def save(self, *args, **kwargs):
+        deferred = self.get_deferred_fields()
+        if deferred and kwargs.get('update_fields') is None:
+            # Still partly built from the token: write only fields the view assigned,
+            # never the (possibly stale) claim values it didn't change
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.attname not in deferred
+                and (f.attname not in self._claims or getattr(self, f.attname) != self._claims[f.attname])
+            ]
+        super().save(*args, **kwargs)
+
+
 # 🏪 Vendor Profile
 class Vendor(models.Model):
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+        null=True, blank=True, related_name='vendor_profile',
+    )
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     address = models.CharField(max_length=255, default="Default Address")
@@ -31,10 +80,58 @@ class Vendor(models.Model):
     delivery_time_minutes = models.PositiveIntegerField(default=30)
     average_rating = models.FloatField(default=0.0)
     logo = CloudinaryField('logo', blank=True, null=True)
+    logo_urls = models.JSONField(default=dict, blank=True)  # {variant: url}, see core.images
+
+    # ⭐ Review aggregates, maintained by create_review / delete_review / delete_user
+    review_count = models.PositiveIntegerField(default=0)
+    rating_1_count = models.PositiveIntegerField(default=0)
+    rating_2_count = models.PositiveIntegerField(default=0)
+    rating_3_count = models.PositiveIntegerField(default=0)
+    rating_4_count = models.PositiveIntegerField(default=0)
+    rating_5_count = models.PositiveIntegerField(default=0)
+
+    RATING_STAT_FIELDS = [
+        'review_count', 'average_rating',
+        'rating_1_count', 'rating_2_count', 'rating_3_count', 'rating_4_count', 'rating_5_count',
+    ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def rating_histogram(self):
+        return {star: getattr(self, f'rating_{star}_count') for star in range(1, 6)}
+
+    def set_rating_histogram(self, histogram):
+        """Set the 1–5 star counts and derive review_count / average_rating from them."""
+        for star in range(1, 6):
+            setattr(self, f'rating_{star}_count', max(int(histogram.get(star, 0)), 0))
+
+        counts = self.rating_histogram
+        self.review_count = sum(counts.values())
+        if self.review_count:
+            self.average_rating = sum(star * n for star, n in counts.items()) / self.review_count
+        else:
+            self.average_rating = 0.0
+
+    @classmethod
+    def adjust_rating_stats(cls, vendor_id, rating, delta):
+        """Add (delta=1) or remove (delta=-1) one review of `rating` stars from a vendor's aggregates."""
+        with transaction.atomic():
+            vendor = cls.objects.select_for_update().only(*cls.RATING_STAT_FIELDS).get(pk=vendor_id)
+            histogram = vendor.rating_histogram
+            histogram[int(rating)] += delta
+            vendor.set_rating_histogram(histogram)
+            vendor.save(update_fields=cls.RATING_STAT_FIELDS)
+        return vendor
+
+    @classmethod
+    def forget_reviews(cls, reviews):
+        """Take every review in the `reviews` queryset out of its vendor's aggregates, before they are deleted."""
+        rows = list(reviews.order_by().values('vendor_id', 'rating').annotate(n=models.Count('id')))
+        for row in rows:
+            cls.adjust_rating_stats(row['vendor_id'], row['rating'], -row['n'])
+
 
 # 🎁 Mystery Bag Listing
 class MysteryBag(models.Model):
@@ -50,6 +147,22 @@ class MysteryBag(models.Model):
     date_posted = models.DateTimeField(default=timezone.now)
     is_active = models.BooleanField(default=True)
 
+    class Meta:
+        indexes = [
+            # Public feed: active bags, newest first (keyset pages)
+            models.Index(
+                fields=['-date_posted', '-id'], name='bag_active_feed_idx',
+                condition=models.Q(is_active=True),
+            ),
+            # NGO donation listing
+            models.Index(
+                fields=['-date_posted'], name='bag_donation_open_idx',
+                condition=models.Q(is_active=True, is_donation=True, quantity_available__gt=0),
+            ),
+            models.Index(fields=['vendor', 'is_active'], name='bag_vendor_active_idx'),
+            models.Index(fields=['-date_posted', '-id'], name='bag_posted_page_idx'),
+        ]
+
     def __str__(self):
         return f"{self.title} from {self.vendor.name}"
 
@@ -79,6 +192,28 @@ class Reservation(models.Model):
 
     type = models.CharField(max_length=10, choices=RESERVATION_TYPE, default='user')
 
+    # 🔁 Client-supplied key so retried reserve requests don't double-book
+    idempotency_key = models.CharField(max_length=64, blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-reserved_at', '-id'], name='res_user_page_idx'),
+            models.Index(fields=['user', 'type', 'reserved_at'], name='res_user_type_idx'),
+            models.Index(fields=['bag', '-reserved_at'], name='res_bag_reserved_idx'),
+            models.Index(fields=['-reserved_at', '-id'], name='res_reserved_page_idx'),
+            models.Index(
+                fields=['bag'], name='res_collected_bag_idx',
+                condition=models.Q(is_collected=True),
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'idempotency_key'],
+                condition=models.Q(idempotency_key__isnull=False),
+                name='unique_reservation_idempotency_key',
+            ),
+        ]
+
     def __str__(self):
         return f"{self.user.username} reserved {self.bag.title} as {self.type}"
 
@@ -105,6 +240,12 @@ class Review(models.Model):
     comment = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['vendor', '-created_at'], name='review_vendor_recent_idx'),
+            models.Index(fields=['-created_at', '-id'], name='review_created_page_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.vendor.name} ({self.rating})"
 
@@ -118,6 +259,7 @@ class NGO(models.Model):
     website = models.URLField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     logo = CloudinaryField('logo', blank=True, null=True)
+    logo_urls = models.JSONField(default=dict, blank=True)  # {variant: url}, see core.images
 
     def __str__(self):
         return self.organization_name
@@ -133,3 +275,103 @@ class UserLocation(models.Model):
 
     def __str__(self):
         return f"{self.user.username} - {self.name or 'Unnamed'}"
+
+
+# 📈 Daily analytics rollups (maintained by core.rollups, rebuilt by `rebuild_rollups`)
+class DailyReservationStat(models.Model):
+    day = models.DateField()
+    vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name='daily_reservation_stats')
+    type = models.CharField(max_length=10, choices=Reservation.RESERVATION_TYPE)
+    payment_method = models.CharField(max_length=20, choices=Reservation.PAYMENT_CHOICES)
+    is_collected = models.BooleanField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'vendor', 'type', 'payment_method', 'is_collected'],
+                name='unique_daily_reservation_stat',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.vendor_id} {self.type}/{self.payment_method}: {self.count}"
+
+
+class DailyUserStat(models.Model):
+    # Sign-ups per day only: a user's role can change later, so role counts are read live
+    day = models.DateField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day'], name='unique_daily_user_stat_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.day}: {self.count}"
+
+
+class DailyReviewStat(models.Model):
+    day = models.DateField()
+    vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name='daily_review_stats')
+    count = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'vendor'], name='unique_daily_review_stat'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.vendor_id}: {self.count}"
+
+
+# 🔢 Live counters (core.counters), sharded so hot keys don't serialize on one row
+class Counter(models.Model):
+    key = models.CharField(max_length=64)
+    shard = models.PositiveSmallIntegerField(default=0)
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['key', 'shard'], name='unique_counter_shard'),
+        ]
+
+    def __str__(self):
+        return f"{self.key}[{self.shard}] = {self.value}"
+
+
+# 🖼️ Logo uploads staged on local disk and pushed to storage by core.logo_uploads
+class LogoUpload(models.Model):
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+
+    vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, null=True, blank=True, related_name='logo_uploads')
+    ngo = models.ForeignKey(NGO, on_delete=models.CASCADE, null=True, blank=True, related_name='logo_uploads')
+    staged_path = models.CharField(max_length=255)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at'], name='logo_upload_queue_idx',
+                condition=models.Q(status__in=['pending', 'processing']),
+            ),
+        ]
+
+    @property
+    def owner(self):
+        return self.vendor or self.ngo
+
+    def __str__(self):
+        return f"Logo upload {self.id} for {self.owner} ({self.status})"
@@ -0,0 +1,135 @@
+import base64
+import binascii
+import datetime
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    # DjangoJSONEncoder truncates to milliseconds; a cursor needs the exact stored value
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPaginator:
+    """
+    Opaque-cursor keyset pagination.
+
+    Pages are cut with a `WHERE (a, b) < (last_a, last_b)` style filter on the ordering
+    columns instead of OFFSET, so deep pages cost the same as the first one. The last
+    ordering column must be unique (normally `id`) to make the order total.
+
+    Paging is opt-in: a request without `?cursor=` or `?page_size=` gets every row in
+    keyset order, which is what clients that never read `X-Next-Cursor` rely on.
+    """
+
+    def __init__(self, ordering):
+        self.ordering = ordering
+        self.fields = [f.lstrip('-') for f in ordering]
+
+    def paginate(self, queryset, request):
+        """Return `(rows, next_cursor)` for the page selected by `?cursor=` / `?page_size=`."""
+        queryset, page_size = self._page(queryset, request)
+        return self._split(list(queryset), page_size)
+
+    async def apaginate(self, queryset, request):
+        """`paginate()` for async views; `request` may be a plain Django request."""
+        queryset, page_size = self._page(queryset, request)
+        return self._split([row async for row in queryset], page_size)
+
+    def _page(self, queryset, request):
+        queryset = queryset.order_by(*self.ordering)
+        params = _params(request)
+        if 'cursor' not in params and 'page_size' not in params:
+            return queryset, None
+        page_size = self.get_page_size(request)
+
+        cursor = params.get('cursor')
+        if cursor:
+            values = self.parse_cursor_values(self.decode_cursor(cursor), queryset.model)
+            queryset = queryset.filter(self._after(values))
+        return queryset[:page_size + 1], page_size
+
+    def _split(self, rows, page_size):
+        if page_size is None or len(rows) <= page_size:
+            return rows, None
+        rows = rows[:page_size]
+        return rows, self.encode_cursor(rows[-1])
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(_params(request).get('page_size', settings.PAGINATION_DEFAULT_PAGE_SIZE))
+        except ValueError:
+            raise ValidationError({'page_size': 'Must be an integer.'})
+        return max(1, min(page_size, settings.PAGINATION_MAX_PAGE_SIZE))
+
+    def encode_cursor(self, row):
+        if isinstance(row, dict):
+            values = [row[f] for f in self.fields]
+        else:
+            values = [getattr(row, f) for f in self.fields]
+        raw = json.dumps(values, cls=CursorEncoder, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (binascii.Error, ValueError):
+            raise ValidationError({'cursor': 'Invalid cursor.'})
+        if not isinstance(values, list) or len(values) != len(self.fields):
+            raise ValidationError({'cursor': 'Invalid cursor.'})
+        return values
+
+    def parse_cursor_values(self, values, model):
+        """Convert decoded cursor values to the ordering fields' Python types, or reject the cursor."""
+        try:
+            parsed = [model._meta.get_field(name).to_python(value) for name, value in zip(self.fields, values)]
+        except (DjangoValidationError, TypeError, ValueError):
+            raise ValidationError({'cursor': 'Invalid cursor.'})
+        if any(value is None for value in parsed):
+            raise ValidationError({'cursor': 'Invalid cursor.'})
+        return parsed
+
+    def _after(self, values):
+        # (a, b, c) after (x, y, z)  =>  a > x  OR  (a = x AND b > y)  OR  (a = x AND b = y AND c > z)
+        condition = Q()
+        for i, field in enumerate(self.ordering):
+            name = self.fields[i]
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            clause = Q(**{f'{name}__{lookup}': values[i]})
+            for prev in range(i):
+                clause &= Q(**{self.fields[prev]: values[prev]})
+            condition |= clause
+        return condition
+
+
+def _params(request):
+    # DRF requests expose `query_params`; the async views get plain Django requests
+    return getattr(request, 'query_params', request.GET)
+
+
+def page_headers(request, next_cursor):
+    headers = {}
+    if next_cursor:
+        headers['X-Next-Cursor'] = next_cursor
+        next_url = replace_query_param(request.build_absolute_uri(), 'cursor', next_cursor)
+        headers['Link'] = f'<{next_url}>; rel="next"'
+    return headers
+
+
+def paginated_response(request, data, next_cursor):
+    """
+    Return the page as a plain list, as these endpoints always have, with the next
+    page advertised in `X-Next-Cursor` and a `Link: <...>; rel="next"` header.
+    """
+    return Response(data, headers=page_headers(request, next_cursor))
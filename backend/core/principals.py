@@ -0,0 +1,22 @@
+from .models import Vendor, NGO
+
+
+def _resolve(request, attr, model):
+    # Cached on the underlying HttpRequest so every helper in this request shares one lookup
+    holder = getattr(request, '_request', request)
+    if not hasattr(holder, attr):
+        setattr(holder, attr, model.objects.filter(user_id=request.user.id).first())
+    profile = getattr(holder, attr)
+    if profile is None:
+        raise model.DoesNotExist(f'No {model.__name__} profile for this user.')
+    return profile
+
+
+def get_request_vendor(request):
+    """The caller's Vendor profile, loaded at most once per request. Raises Vendor.DoesNotExist."""
+    return _resolve(request, '_vendor_profile', Vendor)
+
+
+def get_request_ngo(request):
+    """The caller's NGO profile, loaded at most once per request. Raises NGO.DoesNotExist."""
+    return _resolve(request, '_ngo_profile', NGO)
@@ -0,0 +1,54 @@
+"""
+Response renderers.
+
+FastJSONRenderer produces the same bytes as DRF's JSONRenderer, using orjson
+when it is installed. MessagePackRenderer serves `application/msgpack` to
+clients that ask for it; settings.py only registers it when `msgpack` is
+installed.
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stock renderer
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Types orjson / msgpack don't handle natively (lazy strings, Decimal, QuerySet, ...)
+# are converted exactly as DRF's encoder converts them for JSONRenderer
+_encode_default = JSONEncoder().default
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            # Datetimes go through DRF's encoder too: isoformat() with microseconds kept, UTC as 'Z'
+            ret = orjson.dumps(
+                data, default=_encode_default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except TypeError:  # orjson.JSONEncodeError, e.g. integers beyond 64 bits
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping as JSONRenderer so the output can be embedded in JavaScript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=_encode_default, use_bin_type=True)
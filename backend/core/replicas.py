@@ -0,0 +1,153 @@
+"""
+Read-replica routing.
+
+Views decorated with `@replica_reads` run their reads against one of
+settings.DATABASE_REPLICAS. These are the admin analytics and the public
+read endpoints. All other reads and every write go to `default`.
+
+Read-your-writes: ReplicaPinMiddleware pins a user to the primary for
+REPLICA_PIN_SECONDS after any successful unsafe request they make. A pinned
+user reads from the primary, and also skips the response cache, which an
+anonymous request may have refilled from a lagging replica. The pin lives in
+the default cache, so workers only see each other's pins when REDIS_URL is set.
+
+A replica that refuses connections is skipped for REPLICA_RETRY_SECONDS.
+Reads fall back to the next replica, then to the primary.
+"""
+import contextvars
+import functools
+import inspect
+import itertools
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.utils.deprecation import MiddlewareMixin
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Inside a @replica_reads view: a one-item list holding the replica chosen for the request
+_scope = contextvars.ContextVar('replica_scope', default=None)
+_down_until = {}
+_next = itertools.count()
+_jwt = JWTAuthentication()
+
+
+# 📌 Read-your-writes pins
+
+def _pin_key(user_id):
+    return f'db:pin:{user_id}'
+
+
+def request_user_id(request):
+    """The user id from the request's JWT (or session), without touching the database."""
+    header = _jwt.get_header(request)
+    if header is not None:
+        try:
+            raw = _jwt.get_raw_token(header)
+            return _jwt.get_validated_token(raw)[api_settings.USER_ID_CLAIM] if raw else None
+        except (AuthenticationFailed, KeyError):
+            return None
+    user = getattr(request, 'user', None)
+    return user.pk if user is not None and user.is_authenticated else None
+
+
+def pin(user_id):
+    cache.set(_pin_key(user_id), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(request):
+    if not settings.DATABASE_REPLICAS:
+        return False
+    user_id = request_user_id(request)
+    return user_id is not None and cache.get(_pin_key(user_id)) is not None
+
+
+async def ais_pinned(request):
+    if not settings.DATABASE_REPLICAS:
+        return False
+    user_id = request_user_id(request)
+    return user_id is not None and await cache.aget(_pin_key(user_id)) is not None
+
+
+class ReplicaPinMiddleware(MiddlewareMixin):
+    def process_response(self, request, response):
+        if settings.DATABASE_REPLICAS and request.method not in SAFE_METHODS and response.status_code < 400:
+            user_id = request_user_id(request)
+            if user_id is not None:
+                pin(user_id)
+        return response
+
+
+# 📚 Routing
+
+def replica_reads(view):
+    """Send the view's reads to a replica, unless the requesting user is pinned to the primary."""
+    if inspect.iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if not settings.DATABASE_REPLICAS or request.method not in SAFE_METHODS or await ais_pinned(request):
+                return await view(request, *args, **kwargs)
+            token = _scope.set([None])
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _scope.reset(token)
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not settings.DATABASE_REPLICAS or request.method not in SAFE_METHODS or is_pinned(request):
+            return view(request, *args, **kwargs)
+        token = _scope.set([None])
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _scope.reset(token)
+    return wrapper
+
+
+def choose_replica():
+    """A reachable replica (round robin), or the primary if none is."""
+    replicas = settings.DATABASE_REPLICAS
+    start = next(_next)
+    now = time.monotonic()
+    for i in range(len(replicas)):
+        alias = replicas[(start + i) % len(replicas)]
+        if _down_until.get(alias, 0) > now:
+            continue
+        try:
+            connections[alias].ensure_connection()
+            return alias
+        except DatabaseError as e:
+            logger.warning('Replica %s unavailable, skipping it for %ss: %s', alias, settings.REPLICA_RETRY_SECONDS, e)
+            _down_until[alias] = now + settings.REPLICA_RETRY_SECONDS
+    return DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        chosen = _scope.get()
+        if chosen is None:
+            return DEFAULT_DB_ALIAS
+        if chosen[0] is None:
+            # One replica per request so all its reads see the same snapshot
+            chosen[0] = choose_replica()
+        return chosen[0]
+
+    def db_for_write(self, model, **hints):
+        # Also covers saving an instance that was read from a replica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # replicas hold the same rows as the primary
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
@@ -0,0 +1,97 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Value, When
+from rest_framework.exceptions import ValidationError
+
+from . import counters, rollups
+from .models import MysteryBag, Reservation
+
+
+class BagNotFound(Exception):
+    pass
+
+
+class BagSoldOut(Exception):
+    pass
+
+
+class IdempotencyKeyReused(Exception):
+    """The key was already used for a different bag or reservation type."""
+
+
+def get_idempotency_key(request):
+    """Read the client's retry key from the `Idempotency-Key` header or the request body."""
+    key = request.headers.get('Idempotency-Key')
+    if key is None:
+        key = request.data.get('idempotency_key')
+    if key is None:
+        return None
+    if not isinstance(key, str) or not key.strip():
+        raise ValidationError({'idempotency_key': 'Must be a non-empty string.'})
+    return key.strip()[:64]
+
+
+def reserve_bag_for(user, bag_id, *, reservation_type='user', idempotency_key=None, **details):
+    """
+    Reserve one unit of a bag for `user`.
+
+    The stock check, decrement and `is_active` flip happen in one conditional UPDATE,
+    so concurrent callers can never take the last unit twice and no full-row save is
+    needed. Returns `(reservation, created)`; a repeated `idempotency_key` returns the
+    original reservation with `created=False` instead of booking again, or raises
+    `IdempotencyKeyReused` if that reservation was for another bag or type.
+    """
+    if idempotency_key:
+        existing = _find_existing(user, idempotency_key, bag_id, reservation_type)
+        if existing:
+            return existing, False
+
+    bags = MysteryBag.objects.filter(id=bag_id)
+    if reservation_type == 'ngo':
+        bags = bags.filter(is_donation=True)
+
+    try:
+        with transaction.atomic():
+            updated = bags.filter(is_active=True, quantity_available__gt=0).update(
+                quantity_available=F('quantity_available') - 1,
+                # Evaluated against the pre-update value: the last unit deactivates the bag
+                is_active=Case(When(quantity_available=1, then=Value(False)), default=Value(True)),
+            )
+            if not updated:
+                if bags.filter(quantity_available=0).exists():
+                    raise BagSoldOut()
+                raise BagNotFound()
+
+            bag = MysteryBag.objects.only(
+                'id', 'vendor_id', 'price', 'is_donation', 'hidden_contents', 'is_active').get(id=bag_id)
+            if not bag.is_active:
+                # Our UPDATE took the last unit (the row stays locked until we commit)
+                counters.incr(counters.ACTIVE_BAGS, -1)
+            reservation = Reservation.objects.create(
+                user=user,
+                bag=bag,
+                type=reservation_type,
+                price_paid=0.0 if bag.is_donation or reservation_type == 'ngo' else bag.price,
+                idempotency_key=idempotency_key,
+                **details
+            )
+            rollups.record_reservation(reservation)
+            counters.record_reservation(reservation)
+    except IntegrityError:
+        # A concurrent retry with the same key won the race; our decrement was rolled back
+        existing = _find_existing(user, idempotency_key, bag_id, reservation_type) if idempotency_key else None
+        if existing is None:
+            raise
+        return existing, False
+
+    return reservation, True
+
+
+def _find_existing(user, idempotency_key, bag_id, reservation_type):
+    existing = (
+        Reservation.objects.select_related('bag')
+        .filter(user=user, idempotency_key=idempotency_key)
+        .first()
+    )
+    if existing and (existing.bag_id != int(bag_id) or existing.type != reservation_type):
+        raise IdempotencyKeyReused()
+    return existing
@@ -0,0 +1,156 @@
+from datetime import date, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import DailyReservationStat, DailyUserStat, DailyReviewStat, Reservation, Review, CustomUser
+
+GRANULARITIES = {'day': None, 'week': TruncWeek, 'month': TruncMonth}
+
+
+def upsert_increment(model, keys, **deltas):
+    """Add `deltas` to the row identified by `keys`, creating it on first use."""
+    changes = {field: F(field) + delta for field, delta in deltas.items()}
+    with transaction.atomic():
+        if model.objects.filter(**keys).update(**changes):
+            return
+        try:
+            with transaction.atomic():
+                model.objects.create(**keys, **deltas)
+        except IntegrityError:
+            # Another request created the row between our UPDATE and INSERT
+            model.objects.filter(**keys).update(**changes)
+
+
+def _subtract_groups(model, rows, key_fields, **delta_fields):
+    for row in rows:
+        keys = {field: row[field] for field in key_fields}
+        upsert_increment(model, keys, **{field: -row[source] for field, source in delta_fields.items()})
+
+
+# 🔧 Write-path hooks
+
+def record_reservation(reservation, delta=1):
+    upsert_increment(DailyReservationStat, {
+        'day': timezone.localdate(reservation.reserved_at),
+        'vendor_id': reservation.bag.vendor_id,
+        'type': reservation.type,
+        'payment_method': reservation.payment_method,
+        'is_collected': reservation.is_collected,
+    }, count=delta)
+
+
+def record_reservation_collected(reservation):
+    """Move a reservation from the not-collected to the collected bucket."""
+    with transaction.atomic():
+        reservation.is_collected = False
+        record_reservation(reservation, -1)
+        reservation.is_collected = True
+        record_reservation(reservation, +1)
+
+
+def forget_reservations(queryset):
+    """Subtract reservations that are about to be deleted (directly or by cascade)."""
+    rows = queryset.values(
+        'type', 'payment_method', 'is_collected', day=TruncDate('reserved_at'), vendor_id=F('bag__vendor_id'),
+    ).annotate(n=Count('id'))
+    _subtract_groups(DailyReservationStat, rows,
+                     ['day', 'vendor_id', 'type', 'payment_method', 'is_collected'], count='n')
+
+
+def record_user(user, delta=1):
+    upsert_increment(DailyUserStat, {'day': timezone.localdate(user.date_joined)}, count=delta)
+
+
+def record_review(review, delta=1):
+    upsert_increment(DailyReviewStat, {
+        'day': timezone.localdate(review.created_at),
+        'vendor_id': review.vendor_id,
+    }, count=delta, rating_sum=delta * int(review.rating))
+
+
+def forget_reviews(queryset):
+    rows = queryset.values('vendor_id', day=TruncDate('created_at')).annotate(n=Count('id'), total=Sum('rating'))
+    _subtract_groups(DailyReviewStat, rows, ['day', 'vendor_id'], count='n', rating_sum='total')
+
+
+def forget_user(user):
+    """Subtract a user and everything that cascades from deleting them."""
+    forget_reservations(Reservation.objects.filter(user=user))
+    forget_reviews(Review.objects.filter(user=user))
+    record_user(user, -1)
+
+
+# 🔁 Catch-up
+
+def rebuild(since=None):
+    """Recompute every rollup row on or after `since` (all history if None) from source tables."""
+    with transaction.atomic():
+        reservations = Reservation.objects.all()
+        users = CustomUser.objects.all()
+        reviews = Review.objects.all()
+        stats = [DailyReservationStat.objects.all(), DailyUserStat.objects.all(), DailyReviewStat.objects.all()]
+        if since:
+            reservations = reservations.filter(reserved_at__date__gte=since)
+            users = users.filter(date_joined__date__gte=since)
+            reviews = reviews.filter(created_at__date__gte=since)
+            stats = [qs.filter(day__gte=since) for qs in stats]
+        for qs in stats:
+            qs.delete()
+
+        DailyReservationStat.objects.bulk_create([
+            DailyReservationStat(**row) for row in reservations.values(
+                'type', 'payment_method', 'is_collected', day=TruncDate('reserved_at'), vendor_id=F('bag__vendor_id'),
+            ).annotate(count=Count('id'))
+        ], batch_size=1000)
+        DailyUserStat.objects.bulk_create([
+            DailyUserStat(**row) for row in users.values(day=TruncDate('date_joined')).annotate(count=Count('id'))
+        ], batch_size=1000)
+        DailyReviewStat.objects.bulk_create([
+            DailyReviewStat(**row) for row in reviews.values('vendor_id', day=TruncDate('created_at')).annotate(
+                count=Count('id'), rating_sum=Sum('rating'))
+        ], batch_size=1000)
+
+
+# 📊 Reading
+
+def parse_range(request, default_days=None):
+    """
+    Read `?start=YYYY-MM-DD&end=YYYY-MM-DD&granularity=day|week|month`.
+    Without `start`, the range starts `default_days` ago (or is unbounded if None).
+    """
+    params = request.query_params
+    try:
+        end = date.fromisoformat(params['end']) if params.get('end') else None
+        if params.get('start'):
+            start = date.fromisoformat(params['start'])
+        elif default_days is not None:
+            start = timezone.localdate() - timedelta(days=default_days)
+        else:
+            start = None
+    except ValueError:
+        raise ValidationError({'detail': 'start and end must be YYYY-MM-DD dates.'})
+
+    granularity = params.get('granularity', 'day')
+    if granularity not in GRANULARITIES:
+        raise ValidationError({'granularity': f"Must be one of {', '.join(GRANULARITIES)}."})
+    return start, end, granularity
+
+
+def in_range(queryset, start, end):
+    if start:
+        queryset = queryset.filter(day__gte=start)
+    if end:
+        queryset = queryset.filter(day__lte=end)
+    return queryset
+
+
+def series(queryset, granularity, value='count'):
+    """`{bucket_start_iso: total}` for rollup rows bucketed by day, week or month."""
+    trunc = GRANULARITIES[granularity]
+    bucket = trunc('day') if trunc else F('day')
+    rows = queryset.values(bucket=bucket).annotate(total=Sum(value)).order_by('bucket')
+    return {row['bucket'].isoformat(): row['total'] for row in rows}
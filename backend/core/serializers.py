@@ -2,15 +2,19 @@ from rest_framework import serializers
 from .models import Vendor, MysteryBag, Reservation, NGORequest, Review, NGO, UserLocation
 from django.contrib.auth import get_user_model
 
+from .fieldsets import SparseFieldsMixin
+
 
 User = get_user_model()
 
 # 🏪 Vendor
-class VendorSerializer(serializers.ModelSerializer):
+class VendorSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     logo = serializers.SerializerMethodField()
     image_url = serializers.SerializerMethodField()
-    total_reviews = serializers.SerializerMethodField()
+    total_reviews = serializers.IntegerField(source='review_count', read_only=True)
     average_rating = serializers.SerializerMethodField()
+    rating_histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+    logo_urls = serializers.DictField(child=serializers.CharField(), read_only=True)
 
     class Meta:
         model = Vendor
@@ -18,13 +22,25 @@ class VendorSerializer(serializers.ModelSerializer):
             'id',
             'name',
             'logo',
+            'logo_urls',
             'image_url',
             'total_reviews',
             'average_rating',
+            'rating_histogram',
             'delivery_time_minutes',
         ]
+        # Columns read by fields that aren't plain model attributes (core.fieldsets)
+        field_columns = {
+            'logo': ['logo', 'logo_urls'],
+            'image_url': ['logo', 'logo_urls'],
+            'average_rating': ['average_rating'],
+            'rating_histogram': [f'rating_{star}_count' for star in range(1, 6)],
+        }
 
     def get_logo(self, obj):
+        # Stored at upload time (core.images); the rest is for rows without them yet
+        if obj.logo_urls:
+            return obj.logo_urls['full']
         request = self.context.get('request')
         if request and obj.logo:
             return request.build_absolute_uri(obj.logo.url)
@@ -35,21 +51,16 @@ class VendorSerializer(serializers.ModelSerializer):
     def get_image_url(self, obj):
         return self.get_logo(obj)
 
-    def get_total_reviews(self, obj):
-        return obj.reviews.count()
-
     def get_average_rating(self, obj):
-        reviews = obj.reviews.all()
-        if reviews.exists():
-            return round(sum(r.rating for r in reviews) / reviews.count(), 1)
-        return 0.0
+        # Stored aggregate, kept current by Vendor.adjust_rating_stats
+        return round(obj.average_rating, 1)
 
 
 
 
 
 # 🎁 Mystery Bag
-class MysteryBagSerializer(serializers.ModelSerializer):
+class MysteryBagSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     vendor = VendorSerializer(read_only=True)
 
     class Meta:
@@ -57,15 +68,30 @@ class MysteryBagSerializer(serializers.ModelSerializer):
         exclude = ['hidden_contents']
 
 # 🎁 Mystery Bag with Contents (for Reservations)
-class MysteryBagWithContentsSerializer(serializers.ModelSerializer):
+class MysteryBagWithContentsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     vendor = VendorSerializer(read_only=True)
 
     class Meta:
         model = MysteryBag
         fields = '__all__'
 
+# 🎁 Mystery Bag input for vendor bulk create / update
+class MysteryBagWriteSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MysteryBag
+        fields = [
+            'title',
+            'description',
+            'hidden_contents',
+            'price',
+            'quantity_available',
+            'pickup_start',
+            'pickup_end',
+            'is_donation',
+        ]
+
 # 🛒 Reservation
-class ReservationSerializer(serializers.ModelSerializer):
+class ReservationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     bag_title = serializers.CharField(source='bag.title', read_only=True)
     vendor_name = serializers.CharField(source='bag.vendor.name', read_only=True)
     bag_contents = serializers.CharField(source='bag.hidden_contents', read_only=True)
@@ -134,6 +160,7 @@ class ReviewSerializer(serializers.ModelSerializer):
 class NGOProfileSerializer(serializers.ModelSerializer):
     email = serializers.EmailField(source='user.email', read_only=True)
     phone_number = serializers.CharField(source='user.phone_number', read_only=True)  # ✅ NEW
+    logo_urls = serializers.DictField(child=serializers.CharField(), read_only=True)
 
     class Meta:
         model = NGO
@@ -145,7 +172,9 @@ class NGOProfileSerializer(serializers.ModelSerializer):
             'email',
             'website',
             'logo',
+            'logo_urls',
         ]
+        read_only_fields = ['logo']  # uploads go through core.logo_uploads
 
 
 
@@ -0,0 +1,44 @@
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import counters, rollups
+from .models import ClaimsUser, CustomUser, Review, Vendor
+
+# 👤 User bookkeeping. Users are created and deleted by sign-up, the admin pages,
+# createsuperuser, initadmin and the Django admin, so the counters and the sign-up
+# rollup follow the model rather than any one view. ClaimsUser is a proxy, and
+# signals are sent with the proxy class as sender, so both are connected.
+
+
+@receiver(pre_save, sender=CustomUser)
+@receiver(pre_save, sender=ClaimsUser)
+def remember_saved_role(sender, instance, raw, update_fields, **kwargs):
+    instance._saved_role = None
+    if raw or instance._state.adding or (update_fields is not None and 'role' not in update_fields):
+        return  # Not an update that can write `role` (logins only save last_login)
+    instance._saved_role = CustomUser.objects.filter(pk=instance.pk).values_list('role', flat=True).first()
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_save, sender=ClaimsUser)
+def record_user(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    if created:
+        with transaction.atomic():
+            rollups.record_user(instance)
+            counters.record_user(instance)
+        return
+    saved_role = getattr(instance, '_saved_role', None)
+    if saved_role is not None and saved_role != instance.role:
+        counters.record_role_change(saved_role, instance.role)
+
+
+@receiver(pre_delete, sender=CustomUser)
+@receiver(pre_delete, sender=ClaimsUser)
+def forget_user(sender, instance, **kwargs):
+    # Runs inside the delete's transaction, before the cascade removes the user's rows
+    Vendor.forget_reviews(Review.objects.filter(user=instance))
+    rollups.forget_user(instance)
+    counters.forget_user(instance)
@@ -1,3 +1,229 @@
-from django.test import TestCase
+import base64
+import json
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from . import counters, expiry
+from .geo import VendorGridIndex, haversine_km
+from .models import CustomUser, DailyUserStat, MysteryBag, Reservation, Review, Vendor
+
+
+# ⭐ Vendor rating aggregates
+class VendorRatingStatsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = CustomUser.objects.create_user('admin', password='x', is_staff=True)
+        self.vendor = Vendor.objects.create(name='Bakery')
+        self.other_vendor = Vendor.objects.create(name='Grocer')
+
+    def review(self, user, vendor, rating):
+        self.client.force_authenticate(user)
+        response = self.client.post(f'/api/vendors/{vendor.id}/reviews/create/', {'rating': rating})
+        self.assertEqual(response.status_code, 201)
+
+    def assertStatsMatchReviews(self, vendor):
+        vendor.refresh_from_db()
+        ratings = list(Review.objects.filter(vendor=vendor).values_list('rating', flat=True))
+        self.assertEqual(vendor.review_count, len(ratings))
+        self.assertAlmostEqual(vendor.average_rating, sum(ratings) / len(ratings) if ratings else 0.0)
+        for star in range(1, 6):
+            self.assertEqual(getattr(vendor, f'rating_{star}_count'), ratings.count(star))
+
+    def test_deleting_a_reviewer_removes_their_reviews_from_vendor_stats(self):
+        reviewer = CustomUser.objects.create_user('reviewer', password='x')
+        other = CustomUser.objects.create_user('other', password='x')
+        self.review(reviewer, self.vendor, 1)
+        self.review(reviewer, self.vendor, 1)
+        self.review(reviewer, self.other_vendor, 5)
+        self.review(other, self.vendor, 4)
+
+        self.client.force_authenticate(self.admin)
+        response = self.client.delete(f'/api/admin/user/{reviewer.id}/delete/')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertStatsMatchReviews(self.vendor)
+        self.assertEqual(self.vendor.review_count, 1)
+        self.assertEqual(self.vendor.average_rating, 4.0)
+        self.assertStatsMatchReviews(self.other_vendor)
+        self.assertEqual(self.other_vendor.review_count, 0)
+
+
+# 📍 Nearby bags
+class NearbyBagsValidationTests(TestCase):
+    def test_rejects_non_finite_and_out_of_range_coordinates(self):
+        client = APIClient()
+        for lat, lng in [('nan', '35'), ('inf', '35'), ('33', '-inf'), ('91', '35'), ('33', '180.5')]:
+            response = client.get('/api/bags/nearby/', {'lat': lat, 'lng': lng})
+            self.assertEqual(response.status_code, 400, (lat, lng))
+        response = client.get('/api/bags/nearby/', {'lat': '33', 'lng': '35', 'radius_km': 'nan'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(client.get('/api/bags/nearby/', {'lat': '33.9', 'lng': '35.5'}).status_code, 200)
+
+    def test_far_query_matches_brute_force(self):
+        for i in range(30):
+            Vendor.objects.create(name=f'V{i}', latitude=33.85 + i * 0.003, longitude=35.45 + (i % 7) * 0.01)
+        index = VendorGridIndex()
+        for lat, lng in [(-33.0, -70.0), (33.9, 35.5)]:
+            expected = sorted(
+                (haversine_km(lat, lng, v.latitude, v.longitude), v.id) for v in Vendor.objects.all()
+            )[:5]
+            self.assertEqual(index.nearest(lat, lng, 5), expected)
+
+
+# 📄 Keyset cursors
+class CursorValidationTests(TestCase):
+    def cursor(self, values):
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+    def test_well_formed_cursor_with_wrong_types_is_a_400(self):
+        client = APIClient()
+        for values in (['notadate', 1], ['2024-01-01T00:00:00+00:00', 'x'], [None, 1], [{}, []]):
+            response = client.get('/api/bags/', {'cursor': self.cursor(values)})
+            self.assertEqual(response.status_code, 400, values)
+            self.assertEqual(response.json(), {'cursor': 'Invalid cursor.'})
+
+    def test_valid_cursor_is_accepted(self):
+        response = APIClient().get('/api/bags/', {'cursor': self.cursor(['2024-01-01T00:00:00+00:00', 5])})
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(PAGINATION_DEFAULT_PAGE_SIZE=2)
+    def test_lists_are_only_paged_when_asked(self):
+        vendor = Vendor.objects.create(name='Bakery')
+        for title in 'ABC':
+            MysteryBag.objects.create(vendor=vendor, title=title, price=5, pickup_start='17:00', pickup_end='19:00')
+        client = APIClient()
+
+        response = client.get('/api/bags/')
+        self.assertEqual(len(response.json()), 3)
+        self.assertNotIn('X-Next-Cursor', response)
+
+        response = client.get('/api/bags/', {'page_size': 2})
+        self.assertEqual([bag['title'] for bag in response.json()], ['C', 'B'])
+        response = client.get('/api/bags/', {'cursor': response['X-Next-Cursor']})
+        self.assertEqual([bag['title'] for bag in response.json()], ['A'])
+
+
+# 📈 User analytics
+class UserAnalyticsTests(TestCase):
+    def test_role_change_then_delete_keeps_counts_exact(self):
+        client = APIClient()
+        response = client.post('/api/register/', {
+            'full_name': 'Sam', 'email': 'sam@example.com', 'phone': '123',
+            'password': 'pw-123456', 'confirm_password': 'pw-123456',
+        })
+        self.assertEqual(response.status_code, 201)
+        user = CustomUser.objects.get(email='sam@example.com')
+        admin = CustomUser.objects.create_user('admin', password='x', is_staff=True, role='user')
+        client.force_authenticate(admin)
+
+        self.assertEqual(client.get('/api/user-analytics/').json()['role_counts'], {'user': 2})
+        user.role = 'vendor'
+        user.save()
+        self.assertEqual(client.get('/api/user-analytics/').json()['role_counts'], {'user': 1, 'vendor': 1})
+
+        self.assertEqual(client.delete(f'/api/admin/user/{user.id}/delete/').status_code, 200)
+        analytics = client.get('/api/user-analytics/').json()
+        self.assertEqual(analytics['role_counts'], {'user': 1})
+        self.assertFalse(DailyUserStat.objects.filter(count__lt=0).exists())
+        self.assertEqual(sum(analytics['new_users'].values()), 1)  # the admin
+
+    def test_users_created_and_deleted_outside_sign_up_keep_counts_exact(self):
+        admin = CustomUser.objects.create_superuser('root', 'root@example.com', 'x')
+        ngo = CustomUser.objects.create_user('ngo', password='x', role='ngo')
+        self.assertEqual(counters.get_many([counters.USERS])[counters.USERS], 2)
+        self.assertEqual(counters.role_counts(), {'user': 1, 'ngo': 1})
+
+        CustomUser.objects.filter(id=ngo.id).delete()
+        client = APIClient()
+        client.force_authenticate(admin)
+        analytics = client.get('/api/user-analytics/').json()
+        self.assertEqual(analytics['role_counts'], {'user': 1})
+        self.assertEqual(sum(analytics['new_users'].values()), 1)
+        keys = [counters.USERS, counters.role_key('user'), counters.role_key('ngo')]
+        exact = counters.compute_all()
+        self.assertEqual(counters.get_many(keys), {key: exact.get(key, 0) for key in keys})
+
+
+# 🛍️ Bag analytics
+class BagAnalyticsTests(TestCase):
+    def test_active_and_expired_follow_reservations_toggles_and_expiry(self):
+        client = APIClient()
+        client.force_authenticate(CustomUser.objects.create_user('admin', password='x', is_staff=True))
+        vendor = Vendor.objects.create(name='Bakery')
+        bags = []
+        for quantity in (1, 2, 2):
+            bag = MysteryBag.objects.create(vendor=vendor, title='Bag', price=5, quantity_available=quantity,
+                                            pickup_start='17:00', pickup_end='19:00')
+            counters.record_bag(bag)
+            bags.append(bag)
+
+        self.assertEqual(client.post(f'/api/bags/{bags[0].id}/reserve/').status_code, 201)  # last unit
+        self.assertEqual(client.patch(f'/api/admin/bag/{bags[1].id}/toggle-active/').status_code, 200)
+        MysteryBag.objects.filter(id=bags[2].id).update(date_posted=timezone.now() - timedelta(days=3))
+        self.assertEqual(expiry.sweep(), 1)
+
+        response = client.get('/api/bag-analytics/').json()
+        self.assertEqual((response['active'], response['expired']), (0, 3))
+        exact = counters.compute_all()
+        self.assertEqual(counters.get_many([counters.ACTIVE_BAGS])[counters.ACTIVE_BAGS], exact[counters.ACTIVE_BAGS])
+
+
+# 🔁 Idempotent reservations
+class IdempotencyKeyTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(CustomUser.objects.create_user('buyer', password='x'))
+        vendor = Vendor.objects.create(name='Bakery')
+        self.bag, self.other_bag = (
+            MysteryBag.objects.create(vendor=vendor, title=title, price=5, quantity_available=3,
+                                      pickup_start='17:00', pickup_end='19:00')
+            for title in ('A', 'B')
+        )
+
+    def reserve(self, bag, data):
+        return self.client.post(f'/api/bags/{bag.id}/reserve/', data, format='json')
+
+    def test_non_string_or_blank_key_is_a_400(self):
+        for key in (123, ['k'], {'k': 1}, '   ', ''):
+            response = self.reserve(self.bag, {'idempotency_key': key})
+            self.assertEqual(response.status_code, 400, key)
+        self.assertFalse(Reservation.objects.exists())
+
+    def test_replay_returns_original_and_reuse_for_another_bag_is_a_409(self):
+        self.assertEqual(self.reserve(self.bag, {'idempotency_key': 'k1'}).status_code, 201)
+        self.assertEqual(self.reserve(self.bag, {'idempotency_key': 'k1'}).status_code, 200)
+        self.assertEqual(self.reserve(self.other_bag, {'idempotency_key': 'k1'}).status_code, 409)
+        self.assertEqual(Reservation.objects.count(), 1)
+        self.other_bag.refresh_from_db()
+        self.assertEqual(self.other_bag.quantity_available, 3)
+
+
+# 🔍 Query plans
+class QueryPlanTests(TestCase):
+    def test_hot_endpoints_use_indexes(self):
+        out = StringIO()
+        call_command('check_query_plans', stdout=out)
+        self.assertIn('All hot query plans use indexes.', out.getvalue())
+
+
+# 📦 Bulk bag updates
+class BulkBagPatchTests(TestCase):
+    def test_duplicate_ids_are_rejected_per_item(self):
+        user = CustomUser.objects.create_user('baker', password='x', role='vendor')
+        vendor = Vendor.objects.create(name='Bakery', user=user)
+        bag = MysteryBag.objects.create(vendor=vendor, title='Bag', price=5, pickup_start='17:00', pickup_end='19:00')
+        client = APIClient()
+        client.force_authenticate(user)
+
+        response = client.patch('/api/bags/bulk/', [
+            {'id': bag.id, 'price': '6.00'}, {'id': bag.id, 'price': '7.00'},
+        ], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], [{'index': 1, 'errors': {'id': ['Bag appears more than once.']}}])
+        bag.refresh_from_db()
+        self.assertEqual(str(bag.price), '5.00')
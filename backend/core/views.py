@@ -1,29 +1,42 @@
 from django.contrib.auth import get_user_model
-from django.db.models import Sum
+from django.db import transaction
+from django.db.models import Q, Sum
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.decorators import parser_classes
 from rest_framework.permissions import AllowAny
-from django.contrib.auth.hashers import make_password
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import serializers, status
 from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
-from django.utils import timezone
-from django.db.models import Avg, Count  
-from datetime import timedelta
+from django.conf import settings
+from django.db.models import Count
+import math
 from django.views.decorators.csrf import csrf_exempt
+from django.http import StreamingHttpResponse
 
 
 
-from .models import Vendor, MysteryBag, Reservation, NGORequest, Review, NGO, UserLocation, CustomUser
+from .models import (
+    Vendor, MysteryBag, Reservation, NGORequest, Review, NGO, UserLocation, CustomUser,
+    DailyReservationStat, DailyUserStat, DailyReviewStat, LogoUpload,
+)
+from .authentication import forget_user_status
+from .geo import vendor_index, nearby_active_bags
+from .pagination import KeysetPaginator, paginated_response
+from .principals import get_request_vendor, get_request_ngo
+from .replicas import replica_reads
+from . import counters, exports, fieldsets, hashing, logo_uploads, rollups
+from . import cache as response_cache
+from .cache import cache_response
+from .reservations import reserve_bag_for, get_idempotency_key, BagNotFound, BagSoldOut, IdempotencyKeyReused
 
 from .serializers import (
     VendorSerializer,
     MysteryBagSerializer,
     MysteryBagWithContentsSerializer,
+    MysteryBagWriteSerializer,
     ReservationSerializer,
     SimpleMysteryBagSerializer,
     NGODashboardSummarySerializer,
@@ -37,28 +50,82 @@ from .serializers import (
 
 User = get_user_model()
 
-# ✅ Get all vendors
+# 📄 Keyset orderings for paginated lists (last column must be unique)
+bag_pages = KeysetPaginator(ordering=('-date_posted', '-id'))
+reservation_pages = KeysetPaginator(ordering=('-reserved_at', '-id'))
+review_pages = KeysetPaginator(ordering=('-created_at', '-id'))
+user_pages = KeysetPaginator(ordering=('-date_joined', '-id'))
+
+# ✅ Get all vendors (?fields= for a sparse list, see core.fieldsets)
 @api_view(['GET'])
+@cache_response(response_cache.VENDORS)
+@replica_reads
 def get_vendors(request):
-    vendors = Vendor.objects.all()
-    serializer = VendorSerializer(vendors, many=True, context={'request': request})
+    selection = fieldsets.from_request(request, VendorSerializer)
+    vendors = fieldsets.restrict(Vendor.objects.all(), VendorSerializer, selection)
+    serializer = VendorSerializer(vendors, many=True, selection=selection, context={'request': request})
     return Response(serializer.data)
 
 
-# ✅ Get all active mystery bags
+# ✅ Get all active mystery bags (?fields= / ?expand=vendor for the home feed)
 @api_view(['GET'])
+@cache_response(response_cache.BAGS, response_cache.VENDORS)
+@replica_reads
 def get_all_mystery_bags(request):
-    bags = MysteryBag.objects.filter(is_active=True)
-    serializer = MysteryBagSerializer(bags, many=True)
-    return Response(serializer.data)
+    selection = fieldsets.from_request(request, MysteryBagSerializer)
+    bags = fieldsets.restrict(
+        MysteryBag.objects.filter(is_active=True), MysteryBagSerializer, selection, also=bag_pages.fields)
+    page, next_cursor = bag_pages.paginate(bags, request)
+    serializer = MysteryBagSerializer(page, many=True, selection=selection)
+    return paginated_response(request, serializer.data, next_cursor)
+
+# 📍 Active bags near a point (or a saved location), nearest first
+@api_view(['GET'])
+@replica_reads
+def get_nearby_bags(request):
+    params = request.query_params
+    try:
+        if params.get('location_id'):
+            if not request.user.is_authenticated:
+                return Response({'detail': 'Log in to search from a saved location.'}, status=status.HTTP_401_UNAUTHORIZED)
+            location = UserLocation.objects.get(id=params['location_id'], user=request.user)
+            lat, lng = location.latitude, location.longitude
+        else:
+            lat, lng = float(params['lat']), float(params['lng'])
+
+        radius_km = float(params['radius_km']) if params.get('radius_km') else None
+        k = min(int(params.get('k', settings.NEARBY_DEFAULT_K)), settings.NEARBY_MAX_K)
+    except UserLocation.DoesNotExist:
+        return Response({'detail': 'Location not found.'}, status=status.HTTP_404_NOT_FOUND)
+    except (KeyError, ValueError):
+        return Response(
+            {'detail': 'Provide lat and lng (or location_id), with numeric radius_km and k.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    if not (math.isfinite(lat) and math.isfinite(lng) and -90 <= lat <= 90 and -180 <= lng <= 180):
+        return Response({'detail': 'lat must be within -90..90 and lng within -180..180.'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if k < 1 or (radius_km is not None and not (math.isfinite(radius_km) and radius_km > 0)):
+        return Response({'detail': 'radius_km and k must be positive.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    results = nearby_active_bags(lat, lng, radius_km=radius_km, k=k)
+    data = MysteryBagSerializer([bag for bag, _ in results], many=True, context={'request': request}).data
+    for item, (_, distance) in zip(data, results):
+        item['distance_km'] = round(distance, 2)
+    return Response(data)
 
 # ✅ Get mystery bags by vendor
 @api_view(['GET'])
+@cache_response(response_cache.BAGS, response_cache.VENDORS)
+@replica_reads
 def get_mystery_bags_by_vendor(request, vendor_id):
     try:
         vendor = Vendor.objects.get(id=vendor_id)
-        bags = MysteryBag.objects.filter(vendor=vendor, is_active=True)
-        serializer = MysteryBagSerializer(bags, many=True, context={'request': request})
+        selection = fieldsets.from_request(request, MysteryBagSerializer)
+        bags = fieldsets.restrict(
+            MysteryBag.objects.filter(vendor=vendor, is_active=True), MysteryBagSerializer, selection)
+        serializer = MysteryBagSerializer(bags, many=True, selection=selection, context={'request': request})
         return Response(serializer.data)
     except Vendor.DoesNotExist:
         return Response({'detail': 'Vendor not found.'}, status=status.HTTP_404_NOT_FOUND)
@@ -72,9 +139,10 @@ def get_vendor_my_bags(request):
         if request.user.role != 'vendor':
             return Response({'detail': 'Not authorized.'}, status=status.HTTP_403_FORBIDDEN)
 
-        vendor = Vendor.objects.get(name=request.user.first_name)
-        bags = MysteryBag.objects.filter(vendor=vendor)
-        serializer = MysteryBagSerializer(bags, many=True, context={'request': request})
+        vendor = get_request_vendor(request)
+        selection = fieldsets.from_request(request, MysteryBagSerializer)
+        bags = fieldsets.restrict(MysteryBag.objects.filter(vendor=vendor), MysteryBagSerializer, selection)
+        serializer = MysteryBagSerializer(bags, many=True, selection=selection, context={'request': request})
         return Response(serializer.data)
 
     except Vendor.DoesNotExist:
@@ -85,45 +153,35 @@ def get_vendor_my_bags(request):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def reserve_bag(request, bag_id):
-    print("✅ Reached reserve_bag view with bag_id:", bag_id)
     try:
-        bag = MysteryBag.objects.get(id=bag_id, is_active=True)
-
-        if bag.quantity_available <= 0:
-            return Response({'detail': 'Bag is no longer available.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        delivery_address = request.data.get('delivery_address', '')
-        phone_number = request.data.get('phone_number', '')
-        payment_method = request.data.get('payment_method', 'cash')
-        notes = request.data.get('notes', '')
-
-        # ✅ Create reservation
-        Reservation.objects.create(
-            user=request.user,
-            bag=bag,
-            price_paid=0.0 if bag.is_donation else bag.price,
-            delivery_address=delivery_address,
-            phone_number=phone_number,
-            payment_method=payment_method,
-            notes=notes
+        # ✅ Atomically take one unit and create the reservation
+        reservation, created = reserve_bag_for(
+            request.user,
+            bag_id,
+            idempotency_key=get_idempotency_key(request),
+            delivery_address=request.data.get('delivery_address', ''),
+            phone_number=request.data.get('phone_number', ''),
+            payment_method=request.data.get('payment_method', 'cash'),
+            notes=request.data.get('notes', ''),
         )
 
-        # ✅ Update bag quantity
-        bag.quantity_available -= 1
-        if bag.quantity_available == 0:
-            bag.is_active = False
-        bag.save()
+        response_cache.bump(response_cache.BAGS)
 
         # ✅ Prepare hidden items
+        bag = reservation.bag
         items = [item.strip() for item in bag.hidden_contents.split(',')] if bag.hidden_contents else []
 
         return Response({
             'detail': 'Reservation successful!',
             'items': items
-        }, status=201)
+        }, status=201 if created else 200)
 
-    except MysteryBag.DoesNotExist:
+    except BagSoldOut:
+        return Response({'detail': 'Bag is no longer available.'}, status=status.HTTP_400_BAD_REQUEST)
+    except BagNotFound:
         return Response({'detail': 'Bag not found.'}, status=404)
+    except IdempotencyKeyReused:
+        return Response({'detail': 'Idempotency-Key was already used for a different reservation.'}, status=status.HTTP_409_CONFLICT)
 
 
 
@@ -133,12 +191,13 @@ def reserve_bag(request, bag_id):
 def update_mystery_bag(request, bag_id):
     try:
         bag = MysteryBag.objects.get(id=bag_id)
-        vendor = Vendor.objects.get(name=request.user.first_name)
+        vendor = get_request_vendor(request)
 
-        if bag.vendor != vendor:
+        if bag.vendor_id != vendor.id:
             return Response({'detail': 'You do not have permission to edit this bag.'}, status=status.HTTP_403_FORBIDDEN)
 
         data = request.data
+        was_donation = bag.is_donation
         bag.title = data.get('title', bag.title)
         bag.description = data.get('description', bag.description)
         bag.hidden_contents = data.get('hidden_contents', bag.hidden_contents)
@@ -146,8 +205,11 @@ def update_mystery_bag(request, bag_id):
         bag.quantity_available = data.get('quantity_available', bag.quantity_available)
         bag.pickup_start = data.get('pickup_start', bag.pickup_start)
         bag.pickup_end = data.get('pickup_end', bag.pickup_end)
-        bag.is_donation = data.get('is_donation', bag.is_donation)
+        bag.is_donation = serializers.BooleanField().to_internal_value(data.get('is_donation', bag.is_donation))
         bag.save()
+        if bag.is_donation != was_donation:
+            counters.incr(counters.DONATION_BAGS, 1 if bag.is_donation else -1)
+        response_cache.bump(response_cache.BAGS)
 
         serializer = MysteryBagSerializer(bag)
         return Response(serializer.data)
@@ -161,12 +223,16 @@ def update_mystery_bag(request, bag_id):
 def delete_mystery_bag(request, bag_id):
     try:
         bag = MysteryBag.objects.get(id=bag_id)
-        vendor = Vendor.objects.get(name=request.user.first_name)
+        vendor = get_request_vendor(request)
 
-        if bag.vendor != vendor:
+        if bag.vendor_id != vendor.id:
             return Response({'detail': 'You do not have permission to delete this bag.'}, status=status.HTTP_403_FORBIDDEN)
 
-        bag.delete()
+        with transaction.atomic():
+            rollups.forget_reservations(Reservation.objects.filter(bag=bag))
+            counters.forget_bags(MysteryBag.objects.filter(id=bag.id))
+            bag.delete()
+        response_cache.bump(response_cache.BAGS)
         return Response({'detail': 'Mystery bag deleted successfully.'}, status=status.HTTP_204_NO_CONTENT)
 
     except MysteryBag.DoesNotExist:
@@ -177,14 +243,18 @@ def delete_mystery_bag(request, bag_id):
 @permission_classes([IsAuthenticated])
 def mark_reservation_collected(request, reservation_id):
     try:
-        reservation = Reservation.objects.get(id=reservation_id)
-        vendor = Vendor.objects.get(name=request.user.first_name)
+        reservation = Reservation.objects.select_related('bag').get(id=reservation_id)
+        vendor = get_request_vendor(request)
 
-        if reservation.bag.vendor != vendor:
+        if reservation.bag.vendor_id != vendor.id:
             return Response({'detail': 'You do not have permission to update this reservation.'}, status=status.HTTP_403_FORBIDDEN)
 
-        reservation.is_collected = True
-        reservation.save()
+        if not reservation.is_collected:
+            with transaction.atomic():
+                reservation.is_collected = True
+                reservation.save(update_fields=['is_collected'])
+                rollups.record_reservation_collected(reservation)
+                counters.incr(counters.vendor_key(vendor.id, 'collected'))
 
         return Response({'detail': 'Reservation marked as collected.'})
 
@@ -195,26 +265,27 @@ def mark_reservation_collected(request, reservation_id):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_my_reservations(request):
-    reservations = Reservation.objects.filter(user=request.user).order_by('-reserved_at')
-
-    data = []
-    for r in reservations:
-        data.append({
-            'bag_id': r.bag.id,
-            'title': r.bag.title,
-            'description': r.bag.description,
-            'vendor': r.bag.vendor.name,
-            'reserved_at': r.reserved_at,
-            'price_paid': str(r.price_paid),
-            'payment_method': r.payment_method,
-            'delivery_address': r.delivery_address,
-            'phone_number': r.phone_number,
-            'notes': r.notes,
-            'is_collected': r.is_collected,
-            'contents_revealed': r.bag.hidden_contents,
-        })
-
-    return Response(data, status=200)
+    reservations = Reservation.objects.filter(user=request.user).select_related('bag__vendor')
+    page, next_cursor = reservation_pages.paginate(reservations, request)
+    data = [my_reservation_data(r) for r in page]
+    return paginated_response(request, data, next_cursor)
+
+
+def my_reservation_data(r):
+    return {
+        'bag_id': r.bag.id,
+        'title': r.bag.title,
+        'description': r.bag.description,
+        'vendor': r.bag.vendor.name,
+        'reserved_at': r.reserved_at,
+        'price_paid': str(r.price_paid),
+        'payment_method': r.payment_method,
+        'delivery_address': r.delivery_address,
+        'phone_number': r.phone_number,
+        'notes': r.notes,
+        'is_collected': r.is_collected,
+        'contents_revealed': r.bag.hidden_contents,
+    }
 
 
 # ✅ Get logged-in user profile
@@ -251,6 +322,8 @@ def update_user_profile(request):
     serializer = UserProfileSerializer(user, data=data, partial=True)
     if serializer.is_valid():
         user.save()
+        # Names and phone numbers appear in public review and NGO listings
+        response_cache.bump(response_cache.REVIEWS, response_cache.NGOS)
         return Response({
             "full_name": f"{user.first_name} {user.last_name}".strip(),
             "email": user.email,
@@ -269,11 +342,12 @@ def get_vendor_reservations(request):
         if request.user.role != 'vendor':
             return Response({'detail': 'Not authorized.'}, status=status.HTTP_403_FORBIDDEN)
 
-        vendor = Vendor.objects.get(name=request.user.first_name)
-        reservations = Reservation.objects.filter(bag__vendor=vendor).order_by('-reserved_at')
+        vendor = get_request_vendor(request)
+        reservations = Reservation.objects.filter(bag__vendor=vendor).select_related('bag', 'user')
+        page, next_cursor = reservation_pages.paginate(reservations, request)
 
         data = []
-        for r in reservations:
+        for r in page:
             data.append({
                 'reservation_id': r.id,
                 'bag_title': r.bag.title,
@@ -282,7 +356,7 @@ def get_vendor_reservations(request):
                 'is_collected': r.is_collected,
             })
 
-        return Response(data)
+        return paginated_response(request, data, next_cursor)
 
     except Vendor.DoesNotExist:
         return Response({'detail': 'Vendor profile not found.'}, status=status.HTTP_404_NOT_FOUND)
@@ -296,7 +370,7 @@ def update_vendor_profile(request):
         return Response({'detail': 'Not authorized.'}, status=403)
 
     try:
-        vendor = Vendor.objects.get(name=request.user.first_name)
+        vendor = get_request_vendor(request)
         data = request.data
 
         vendor.description = data.get('description', vendor.description)
@@ -306,14 +380,42 @@ def update_vendor_profile(request):
         vendor.delivery_available = data.get('delivery_available', vendor.delivery_available)
         vendor.delivery_time_minutes = data.get('delivery_time_minutes', vendor.delivery_time_minutes)
 
-        if 'logo' in request.FILES:
-            vendor.logo = request.FILES['logo']
-
-        vendor.save()
-        return Response(VendorSerializer(vendor).data)
+        with transaction.atomic():
+            vendor.save()
+            # Staged locally and uploaded in the background (core.logo_uploads)
+            upload = logo_uploads.stage(request.FILES['logo'], vendor=vendor) if 'logo' in request.FILES else None
+        vendor_index.upsert(vendor.id, vendor.latitude, vendor.longitude)
+        response_cache.bump(response_cache.VENDORS, response_cache.BAGS)
+        data = VendorSerializer(vendor).data
+        if upload:
+            data['logo_upload'] = logo_upload_data(upload)
+        return Response(data)
 
     except Vendor.DoesNotExist:
         return Response({'detail': 'Vendor not found.'}, status=404)
+    except logo_uploads.InvalidImage as e:
+        return Response({'detail': str(e)}, status=400)
+
+
+def logo_upload_data(upload):
+    return {
+        'id': upload.id,
+        'status': upload.status,
+        'attempts': upload.attempts,
+        'error': upload.last_error if upload.status == 'failed' else None,
+    }
+
+
+# 🖼️ Progress of a background logo upload (vendor or NGO owner only)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_logo_upload(request, upload_id):
+    try:
+        upload = LogoUpload.objects.get(
+            Q(vendor__user_id=request.user.id) | Q(ngo__user_id=request.user.id), id=upload_id)
+    except LogoUpload.DoesNotExist:
+        return Response({'detail': 'Logo upload not found.'}, status=404)
+    return Response(logo_upload_data(upload))
 
 # ✅ User registration
 @api_view(['POST'])
@@ -339,14 +441,13 @@ def register_user(request):
         user = User.objects.create(
             username=email.split('@')[0],
             email=email,
-            password=make_password(password),
+            password=hashing.make_password(password),
             first_name=full_name,
+            phone_number=phone,  # ✅ Saved in the same INSERT
         )
 
-        user.phone_number = phone  # ✅ Save phone number here
-        user.save()
-
-        refresh = RefreshToken.for_user(user)
+        # Same claims as login, so ClaimsJWTAuthentication can skip the user query
+        refresh = MyTokenObtainPairSerializer.get_token(user)
         return Response({
             'refresh': str(refresh),
             'access': str(refresh.access_token),
@@ -385,7 +486,7 @@ def create_mystery_bag(request):
         if request.user.role != 'vendor':
             return Response({'detail': 'Not authorized.'}, status=status.HTTP_403_FORBIDDEN)
 
-        vendor = Vendor.objects.get(name=request.user.first_name)
+        vendor = get_request_vendor(request)
 
         data = request.data
         bag = MysteryBag.objects.create(
@@ -397,8 +498,10 @@ def create_mystery_bag(request):
             quantity_available=data.get('quantity_available'),
             pickup_start=data.get('pickup_start'),
             pickup_end=data.get('pickup_end'),
-            is_donation=data.get('is_donation', False),
+            is_donation=serializers.BooleanField().to_internal_value(data.get('is_donation', False)),
         )
+        counters.record_bag(bag)
+        response_cache.bump(response_cache.BAGS)
 
         serializer = MysteryBagSerializer(bag)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -408,6 +511,83 @@ def create_mystery_bag(request):
     except Exception as e:
         return Response({'detail': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+# 📦 Vendor: create (POST) or partially update (PATCH) many bags at once
+@api_view(['POST', 'PATCH'])
+@permission_classes([IsAuthenticated])
+def bulk_mystery_bags(request):
+    if request.user.role != 'vendor':
+        return Response({'detail': 'Not authorized.'}, status=status.HTTP_403_FORBIDDEN)
+
+    items = request.data
+    if not isinstance(items, list) or not items:
+        return Response({'detail': 'Send a non-empty JSON array of bags.'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(items) > settings.BULK_BAGS_MAX_ITEMS:
+        return Response({'detail': f'At most {settings.BULK_BAGS_MAX_ITEMS} bags per request.'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        vendor = get_request_vendor(request)
+    except Vendor.DoesNotExist:
+        return Response({'detail': 'Vendor profile not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+    # ✅ Validate every item before writing anything
+    if request.method == 'POST':
+        serializers_ = [MysteryBagWriteSerializer(data=item) for item in items]
+    else:
+        ids = [item.get('id') if isinstance(item, dict) else None for item in items]
+        owned = MysteryBag.objects.filter(vendor=vendor).in_bulk([i for i in ids if isinstance(i, int)])
+        serializers_ = [
+            MysteryBagWriteSerializer(owned[i], data=item, partial=True) if i in owned else None
+            for i, item in zip(ids, items)
+        ]
+
+    errors = []
+    seen = set()
+    for index, serializer in enumerate(serializers_):
+        if serializer is None:
+            errors.append({'index': index, 'errors': {'id': ['Bag not found.']}})
+        elif serializer.instance is not None and serializer.instance.id in seen:
+            errors.append({'index': index, 'errors': {'id': ['Bag appears more than once.']}})
+        elif not serializer.is_valid():
+            errors.append({'index': index, 'errors': serializer.errors})
+        if serializer is not None and serializer.instance is not None:
+            seen.add(serializer.instance.id)
+    if errors:
+        return Response({'detail': 'No bags were saved.', 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+    # ✅ Apply in one transaction with constant round trips
+    with transaction.atomic():
+        if request.method == 'POST':
+            bags = MysteryBag.objects.bulk_create(
+                [MysteryBag(vendor=vendor, **serializer.validated_data) for serializer in serializers_])
+            donations = sum(bag.is_donation for bag in bags)
+            counters.incr(counters.BAGS, len(bags))
+            counters.incr(counters.vendor_key(vendor.id, 'bags'), len(bags))
+            counters.incr(counters.ACTIVE_BAGS, sum(bag.is_active for bag in bags))
+        else:
+            bags, fields, donations = [], set(), 0
+            for serializer in serializers_:
+                bag = serializer.instance
+                was_donation = bag.is_donation
+                for field, value in serializer.validated_data.items():
+                    setattr(bag, field, value)
+                fields.update(serializer.validated_data)
+                donations += int(bag.is_donation) - int(was_donation)
+                bags.append(bag)
+            if fields:
+                MysteryBag.objects.bulk_update(bags, list(fields), batch_size=500)
+        counters.incr(counters.DONATION_BAGS, donations)
+    response_cache.bump(response_cache.BAGS)
+
+    for bag in bags:
+        bag.vendor = vendor
+    data = MysteryBagSerializer(bags, many=True, context={'request': request}).data
+    return Response(
+        {'results': [{'index': index, 'bag': bag} for index, bag in enumerate(data)]},
+        status=status.HTTP_201_CREATED if request.method == 'POST' else status.HTTP_200_OK,
+    )
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_vendor_profile(request):
@@ -415,7 +595,7 @@ def get_vendor_profile(request):
         if request.user.role != 'vendor':
             return Response({'detail': 'Not authorized.'}, status=status.HTTP_403_FORBIDDEN)
 
-        vendor = Vendor.objects.get(name=request.user.first_name)
+        vendor = get_request_vendor(request)
 
         return Response({
             'name': vendor.name,
@@ -439,11 +619,10 @@ def get_vendor_dashboard_summary(request):
         if request.user.role != 'vendor':
             return Response({'detail': 'Not authorized.'}, status=status.HTTP_403_FORBIDDEN)
 
-        vendor = Vendor.objects.get(name=request.user.first_name)
+        vendor = get_request_vendor(request)
 
-        total_bags = MysteryBag.objects.filter(vendor=vendor).count()
-        total_reservations = Reservation.objects.filter(bag__vendor=vendor).count()
-        collected_reservations = Reservation.objects.filter(bag__vendor=vendor, is_collected=True).count()
+        keys = [counters.vendor_key(vendor.id, name) for name in ('bags', 'reservations', 'collected')]
+        total_bags, total_reservations, collected_reservations = counters.get_many(keys).values()
 
         if total_reservations > 0:
             collected_percentage = round((collected_reservations / total_reservations) * 100, 1)
@@ -478,12 +657,16 @@ def create_review(request, vendor_id):
     try:
         vendor = Vendor.objects.get(id=vendor_id)
 
-        Review.objects.create(
-            user=request.user,
-            vendor=vendor,
-            rating=rating,
-            comment=comment,
-        )
+        with transaction.atomic():
+            review = Review.objects.create(
+                user=request.user,
+                vendor=vendor,
+                rating=rating,
+                comment=comment,
+            )
+            Vendor.adjust_rating_stats(vendor.id, rating, +1)
+            rollups.record_review(review)
+        response_cache.bump(response_cache.REVIEWS, response_cache.VENDORS, response_cache.BAGS)
         return Response({"detail": "Review submitted successfully."}, status=201)
 
     except Vendor.DoesNotExist:
@@ -491,10 +674,12 @@ def create_review(request, vendor_id):
 
 # ⭐ Get reviews for a vendor
 @api_view(['GET'])
+@cache_response(response_cache.REVIEWS)
+@replica_reads
 def get_reviews_by_vendor(request, vendor_id):
     try:
         vendor = Vendor.objects.get(id=vendor_id)
-        reviews = vendor.reviews.all().order_by('-created_at')
+        reviews = vendor.reviews.select_related('user').order_by('-created_at')
         serializer = ReviewSerializer(reviews, many=True)
         return Response(serializer.data)
 
@@ -510,7 +695,7 @@ def get_vendor_reviews(request):
         if request.user.role != 'vendor':
             return Response({'detail': 'Not authorized.'}, status=status.HTTP_403_FORBIDDEN)
 
-        vendor = Vendor.objects.get(name=request.user.first_name)
+        vendor = get_request_vendor(request)
         reviews = vendor.reviews.all().order_by('-created_at')  # vendor.reviews from related_name in model
 
         data = []
@@ -553,7 +738,8 @@ def get_donation_bags(request):
     if request.user.role != 'ngo':
         return Response({'detail': 'Not authorized.'}, status=status.HTTP_403_FORBIDDEN)
 
-    bags = MysteryBag.objects.filter(is_donation=True, is_active=True, quantity_available__gt=0)
+    bags = MysteryBag.objects.filter(is_donation=True, is_active=True, quantity_available__gt=0)\
+        .select_related('vendor').order_by('-date_posted')
     serializer = SimpleMysteryBagSerializer(bags, many=True)
     return Response(serializer.data)
 
@@ -564,36 +750,35 @@ def reserve_donation_bag(request, bag_id):
         return Response({'detail': 'Not authorized.'}, status=status.HTTP_403_FORBIDDEN)
 
     try:
-        bag = MysteryBag.objects.get(id=bag_id, is_active=True, is_donation=True)
-        if bag.quantity_available <= 0:
-            return Response({'detail': 'Bag is no longer available.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        Reservation.objects.create(
-            user=request.user,
-            bag=bag,
-            price_paid=0.0,
-            type='ngo',
+        _, created = reserve_bag_for(
+            request.user,
+            bag_id,
+            reservation_type='ngo',
+            idempotency_key=get_idempotency_key(request),
             delivery_address=request.data.get('delivery_address', ''),
             phone_number=request.data.get('phone_number', ''),
             payment_method='cash',
             notes=request.data.get('notes', '')
         )
+        response_cache.bump(response_cache.BAGS)
 
-        bag.quantity_available -= 1
-        if bag.quantity_available == 0:
-            bag.is_active = False
-        bag.save()
-
-        return Response({'detail': 'Donation reserved successfully!'}, status=status.HTTP_201_CREATED)
+        return Response(
+            {'detail': 'Donation reserved successfully!'},
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
 
-    except MysteryBag.DoesNotExist:
+    except BagSoldOut:
+        return Response({'detail': 'Bag is no longer available.'}, status=status.HTTP_400_BAD_REQUEST)
+    except BagNotFound:
         return Response({'detail': 'Donation bag not found.'}, status=status.HTTP_404_NOT_FOUND)
+    except IdempotencyKeyReused:
+        return Response({'detail': 'Idempotency-Key was already used for a different reservation.'}, status=status.HTTP_409_CONFLICT)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_ngo_profile(request):
     try:
-        ngo = NGO.objects.get(user=request.user)
+        ngo = get_request_ngo(request)
         serializer = NGOProfileSerializer(ngo)
         return Response(serializer.data)
     except NGO.DoesNotExist:
@@ -606,21 +791,29 @@ def get_ngo_profile(request):
 @permission_classes([IsAuthenticated])
 def update_ngo_profile(request):
     try:
-        ngo = NGO.objects.get(user=request.user)
+        ngo = get_request_ngo(request)
         serializer = NGOProfileSerializer(ngo, data=request.data, partial=True)  # partial=True allows for partial updates
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                serializer.save()
+                upload = logo_uploads.stage(request.FILES['logo'], ngo=ngo) if 'logo' in request.FILES else None
 
             # ✅ Update User's phone number
             phone = request.data.get('phone_number')
             if phone:
                 request.user.phone_number = phone
                 request.user.save()
+            response_cache.bump(response_cache.NGOS)
 
-            return Response(serializer.data)
+            data = serializer.data
+            if upload:
+                data['logo_upload'] = logo_upload_data(upload)
+            return Response(data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     except NGO.DoesNotExist:
         return Response({'detail': 'NGO profile not found.'}, status=status.HTTP_404_NOT_FOUND)
+    except logo_uploads.InvalidImage as e:
+        return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
 
@@ -635,16 +828,28 @@ def create_ngo_profile(request):
 
     serializer = NGOProfileSerializer(data=request.data)
     if serializer.is_valid():
-        serializer.save(user=request.user)
-        return Response({'detail': 'NGO profile created successfully.'}, status=201)
+        try:
+            with transaction.atomic():
+                ngo = serializer.save(user=request.user)
+                upload = logo_uploads.stage(request.FILES['logo'], ngo=ngo) if 'logo' in request.FILES else None
+        except logo_uploads.InvalidImage as e:
+            return Response({'detail': str(e)}, status=400)
+        counters.incr(counters.NGOS)
+        response_cache.bump(response_cache.NGOS)
+        data = {'detail': 'NGO profile created successfully.'}
+        if upload:
+            data['logo_upload'] = logo_upload_data(upload)
+        return Response(data, status=201)
     return Response(serializer.errors, status=400)
 
 
 
 @api_view(['GET'])
 @permission_classes([AllowAny])  # 🔓 Make it public
+@cache_response(response_cache.NGOS)
+@replica_reads
 def public_ngos(request):
-    ngos = NGO.objects.all()
+    ngos = NGO.objects.select_related('user')
     serializer = NGOProfileSerializer(ngos, many=True)
     return Response(serializer.data)
 
@@ -652,27 +857,33 @@ def public_ngos(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@replica_reads
 def get_admin_dashboard_stats(request):
     if not request.user.is_staff:  # Or use is_superuser if needed
         return Response({'detail': 'Not authorized'}, status=403)
 
-    total_users = User.objects.count()
-    total_vendors = Vendor.objects.count()
-    total_ngos = NGO.objects.count()
-    total_bags = MysteryBag.objects.count()
-    donated_bags = MysteryBag.objects.filter(is_donation=True).count()
-    total_reservations = Reservation.objects.count()
+    totals = counters.get_many([
+        counters.USERS, counters.VENDORS, counters.NGOS,
+        counters.BAGS, counters.DONATION_BAGS, counters.RESERVATIONS,
+    ])
 
     return Response({
-        'total_users': total_users,
-        'total_vendors': total_vendors,
-        'total_ngos': total_ngos,
-        'total_bags': total_bags,
-        'donated_bags': donated_bags,
-        'total_reservations': total_reservations,
+        'total_users': totals[counters.USERS],
+        'total_vendors': totals[counters.VENDORS],
+        'total_ngos': totals[counters.NGOS],
+        'total_bags': totals[counters.BAGS],
+        'donated_bags': totals[counters.DONATION_BAGS],
+        'total_reservations': totals[counters.RESERVATIONS],
     })
 
 
+# 🗃️ Response cache hit/miss counters
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def get_cache_stats(request):
+    return Response(response_cache.get_stats())
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_user_locations(request):
@@ -700,8 +911,9 @@ def create_user_location(request):
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def list_users(request):
-    users = User.objects.all().values('id', 'first_name', 'email', 'role', 'is_active', 'date_joined')
-    return Response(list(users))
+    users = User.objects.values('id', 'first_name', 'email', 'role', 'is_active', 'date_joined')
+    page, next_cursor = user_pages.paginate(users, request)
+    return paginated_response(request, page, next_cursor)
 
 # ✅ Toggle user active status
 @api_view(['PATCH'])
@@ -711,6 +923,7 @@ def toggle_user_active(request, user_id):
         user = User.objects.get(id=user_id)
         user.is_active = not user.is_active
         user.save()
+        forget_user_status(user.id)
         return Response({'detail': f"User active status set to {user.is_active}"})
     except User.DoesNotExist:
         return Response({'detail': 'User not found'}, status=404)
@@ -720,7 +933,10 @@ def toggle_user_active(request, user_id):
 @permission_classes([IsAdminUser])
 def delete_user(request, user_id):
     try:
-        User.objects.get(id=user_id).delete()
+        user = User.objects.get(id=user_id)
+        user.delete()  # core.signals.forget_user updates the stats in the same transaction
+        forget_user_status(user_id)
+        response_cache.bump(*response_cache.ALL_NAMESPACES)
         return Response({'detail': 'User deleted'})
     except User.DoesNotExist:
         return Response({'detail': 'User not found'}, status=404)
@@ -730,16 +946,22 @@ def delete_user(request, user_id):
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def list_reviews(request):
-    reviews = Review.objects.all().order_by('-created_at')
-    serializer = ReviewSerializer(reviews, many=True)
-    return Response(serializer.data)
+    reviews = Review.objects.select_related('user')
+    page, next_cursor = review_pages.paginate(reviews, request)
+    serializer = ReviewSerializer(page, many=True)
+    return paginated_response(request, serializer.data, next_cursor)
 
 # ✅ Delete review
 @api_view(['DELETE'])
 @permission_classes([IsAdminUser])
 def delete_review(request, review_id):
     try:
-        Review.objects.get(id=review_id).delete()
+        with transaction.atomic():
+            review = Review.objects.select_for_update().get(id=review_id)
+            review.delete()
+            Vendor.adjust_rating_stats(review.vendor_id, review.rating, -1)
+            rollups.record_review(review, -1)
+        response_cache.bump(response_cache.REVIEWS, response_cache.VENDORS, response_cache.BAGS)
         return Response({'detail': 'Review deleted'})
     except Review.DoesNotExist:
         return Response({'detail': 'Review not found'}, status=404)
@@ -748,16 +970,23 @@ def delete_review(request, review_id):
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def list_bags(request):
-    bags = MysteryBag.objects.all()
-    serializer = MysteryBagSerializer(bags, many=True)
-    return Response(serializer.data)
+    selection = fieldsets.from_request(request, MysteryBagSerializer)
+    bags = fieldsets.restrict(MysteryBag.objects.all(), MysteryBagSerializer, selection, also=bag_pages.fields)
+    page, next_cursor = bag_pages.paginate(bags, request)
+    serializer = MysteryBagSerializer(page, many=True, selection=selection)
+    return paginated_response(request, serializer.data, next_cursor)
 
 # ✅ Delete bag
 @api_view(['DELETE'])
 @permission_classes([IsAdminUser])
 def delete_bag(request, bag_id):
     try:
-        MysteryBag.objects.get(id=bag_id).delete()
+        bag = MysteryBag.objects.get(id=bag_id)
+        with transaction.atomic():
+            rollups.forget_reservations(Reservation.objects.filter(bag=bag))
+            counters.forget_bags(MysteryBag.objects.filter(id=bag.id))
+            bag.delete()
+        response_cache.bump(response_cache.BAGS)
         return Response({'detail': 'Bag deleted'})
     except MysteryBag.DoesNotExist:
         return Response({'detail': 'Bag not found'}, status=404)
@@ -769,7 +998,10 @@ def toggle_bag_active(request, bag_id):
     try:
         bag = MysteryBag.objects.get(id=bag_id)
         bag.is_active = not bag.is_active
-        bag.save()
+        with transaction.atomic():
+            bag.save()
+            counters.incr(counters.ACTIVE_BAGS, 1 if bag.is_active else -1)
+        response_cache.bump(response_cache.BAGS)
         return Response({'detail': f"Bag active status set to {bag.is_active}"})
     except MysteryBag.DoesNotExist:
         return Response({'detail': 'Bag not found'}, status=404)
@@ -778,16 +1010,47 @@ def toggle_bag_active(request, bag_id):
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def list_reservations(request):
-    reservations = Reservation.objects.all().order_by('-reserved_at')
-    serializer = ReservationSerializer(reservations, many=True)
-    return Response(serializer.data)
+    selection = fieldsets.from_request(request, ReservationSerializer)
+    reservations = fieldsets.restrict(
+        Reservation.objects.all(), ReservationSerializer, selection, also=reservation_pages.fields)
+    page, next_cursor = reservation_pages.paginate(reservations, request)
+    serializer = ReservationSerializer(page, many=True, selection=selection)
+    return paginated_response(request, serializer.data, next_cursor)
+
+# 📤 Streaming export: ?output=csv|ndjson&start=&end=&vendor=&type=&gzip=1
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def export_dataset(request, dataset):
+    params = request.query_params
+    output = params.get('output', 'csv')
+    compress = params.get('gzip') in ('1', 'true')
+    try:
+        queryset = exports.build_queryset(
+            dataset,
+            start=params.get('start'),
+            end=params.get('end'),
+            vendor=params.get('vendor'),
+            type=params.get('type'),
+        )
+        chunks = exports.stream(dataset, queryset, output=output, compress=compress)
+    except ValueError as e:
+        return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    content_type = 'application/gzip' if compress else exports.FORMATS[output][0]
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{exports.filename(dataset, output, compress)}"'
+    return response
 
 # ✅ Delete reservation
 @api_view(['DELETE'])
 @permission_classes([IsAdminUser])
 def delete_reservation(request, reservation_id):
     try:
-        Reservation.objects.get(id=reservation_id).delete()
+        reservation = Reservation.objects.get(id=reservation_id)
+        with transaction.atomic():
+            rollups.forget_reservations(Reservation.objects.filter(id=reservation.id))
+            counters.forget_reservations(Reservation.objects.filter(id=reservation.id))
+            reservation.delete()
         return Response({'detail': 'Reservation deleted'})
     except Reservation.DoesNotExist:
         return Response({'detail': 'Reservation not found'}, status=404)
@@ -821,36 +1084,44 @@ def create_vendor_profile(request):
         user = User.objects.get(id=user_id)
 
         vendor = Vendor.objects.create(user=user, name=name)
+        vendor_index.upsert(vendor.id, vendor.latitude, vendor.longitude)
+        counters.incr(counters.VENDORS)
+        response_cache.bump(response_cache.VENDORS)
         return Response({"detail": "Vendor profile created", "vendor_id": vendor.id}, status=201)
     except Exception as e:
         return Response({"detail": str(e)}, status=400)
 
 
+# 📈 Analytics below read the daily rollup tables (core.rollups) and accept
+# ?start=YYYY-MM-DD&end=YYYY-MM-DD&granularity=day|week|month
+
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
+@replica_reads
 def vendor_analytics(request):
-    vendors = Vendor.objects.all()
+    start, end, _ = rollups.parse_range(request)
+    stats = rollups.in_range(DailyReservationStat.objects.all(), start, end)
+    totals = dict(stats.values_list('vendor_id').annotate(total=Sum('count')))
+
     result = []
-    for vendor in vendors:
-        reservations = Reservation.objects.filter(bag__vendor=vendor).count()
+    for vendor_id, name in Vendor.objects.values_list('id', 'name'):
         result.append({
-            "name": vendor.name,
-            "reservations": reservations
+            "name": name,
+            "reservations": totals.get(vendor_id, 0)
         })
     return Response(result)
 
 
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
+@replica_reads
 def review_analytics(request):
-    ratings = Review.objects.values('vendor__name')\
-        .annotate(avg_rating=Avg('rating'))
+    start, end, _ = rollups.parse_range(request)
+    stats = rollups.in_range(DailyReviewStat.objects.all(), start, end)
+    rows = stats.values('vendor__name').annotate(n=Sum('count'), total=Sum('rating_sum')).filter(n__gt=0)
 
-    counts = Review.objects.values('vendor__name')\
-        .annotate(review_count=Count('id'))
-
-    avg_ratings = {entry['vendor__name']: round(entry['avg_rating'], 2) for entry in ratings}
-    review_counts = {entry['vendor__name']: entry['review_count'] for entry in counts}
+    avg_ratings = {row['vendor__name']: round(row['total'] / row['n'], 2) for row in rows}
+    review_counts = {row['vendor__name']: row['n'] for row in rows}
 
     return Response({
         "avg_ratings": avg_ratings,
@@ -860,38 +1131,36 @@ def review_analytics(request):
 
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
+@replica_reads
 def reservation_analytics(request):
-    today = timezone.now().date()
-    start_date = today - timedelta(days=30)
-
-    reservations = Reservation.objects.filter(reserved_at__date__gte=start_date)
-    daily_counts = {}
-    for r in reservations:
-        day = r.reserved_at.date().isoformat()
-        daily_counts[day] = daily_counts.get(day, 0) + 1
+    start, end, granularity = rollups.parse_range(request, default_days=30)
+    stats = DailyReservationStat.objects.all()
+    daily_counts = rollups.series(rollups.in_range(stats, start, end), granularity)
 
-    paid_count = Reservation.objects.exclude(payment_method='cash').count()
-    unpaid_count = Reservation.objects.filter(payment_method='cash').count()
-
-    collected = Reservation.objects.filter(is_collected=True).count()
-    not_collected = Reservation.objects.filter(is_collected=False).count()
+    # Totals cover all history unless a range was asked for explicitly
+    if request.query_params.get('start') or request.query_params.get('end'):
+        stats = rollups.in_range(stats, start, end)
+    by_payment = dict(stats.values_list('payment_method').annotate(total=Sum('count')))
+    by_collected = dict(stats.values_list('is_collected').annotate(total=Sum('count')))
 
     return Response({
         "daily_counts": daily_counts,
-        "paid": paid_count,
-        "unpaid": unpaid_count,
+        "paid": sum(n for method, n in by_payment.items() if method != 'cash'),
+        "unpaid": by_payment.get('cash', 0),
         "status_counts": {
-            "collected": collected,
-            "not_collected": not_collected
+            "collected": by_collected.get(True, 0),
+            "not_collected": by_collected.get(False, 0)
         }
     })
 
 
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
+@replica_reads
 def bag_analytics(request):
-    active_count = MysteryBag.objects.filter(is_active=True).count()
-    expired_count = MysteryBag.objects.filter(is_active=False).count()
+    totals = counters.get_many([counters.BAGS, counters.ACTIVE_BAGS])
+    active_count = totals[counters.ACTIVE_BAGS]
+    expired_count = totals[counters.BAGS] - active_count
 
     bags_per_vendor = MysteryBag.objects.values('vendor__name')\
         .annotate(count=Count('id'))
@@ -906,22 +1175,17 @@ def bag_analytics(request):
 
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
+@replica_reads
 def user_analytics(request):
-    roles = User.objects.values('role').annotate(count=Count('id'))
-    role_counts = {entry['role'] or 'unknown': entry['count'] for entry in roles}
+    start, end, granularity = rollups.parse_range(request, default_days=30)
+    role_counts = counters.role_counts()
 
     ngo_regions = {}
     if hasattr(User, 'region'):
         ngos = User.objects.filter(role='ngo').values('region').annotate(count=Count('id'))
         ngo_regions = {entry['region'] or 'unspecified': entry['count'] for entry in ngos}
 
-    start_date = timezone.now().date() - timedelta(days=30)
-    new_users = User.objects.filter(date_joined__date__gte=start_date)
-
-    daily_new = {}
-    for u in new_users:
-        day = u.date_joined.date().isoformat()
-        daily_new[day] = daily_new.get(day, 0) + 1
+    daily_new = rollups.series(rollups.in_range(DailyUserStat.objects.all(), start, end), granularity)
 
     return Response({
         "role_counts": role_counts,
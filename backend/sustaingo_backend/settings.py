@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import importlib.util
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,6 +48,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'core.compression.CompressionMiddleware',
+    'core.replicas.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -94,6 +98,36 @@ DATABASES = {
     }
 }
 
+# 📚 Read replicas (core.replicas): DATABASE_REPLICA_HOSTS="host1,host2" adds replica_0, replica_1
+# with the primary's credentials. Analytics and public reads go there; everything else uses default.
+for i, host in enumerate(h.strip() for h in os.environ.get('DATABASE_REPLICA_HOSTS', '').split(',') if h.strip()):
+    DATABASES[f'replica_{i}'] = {**DATABASES['default'], 'HOST': host, 'TEST': {'MIRROR': 'default'}}
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias.startswith('replica_')]
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+REPLICA_PIN_SECONDS = 10    # a user reads from the primary this long after they write
+REPLICA_RETRY_SECONDS = 30  # an unreachable replica is skipped this long
+
+# Cache
+# Local memory per process by default; set REDIS_URL to share one cache across workers.
+
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': 2000},
+        }
+    }
+
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 60))  # seconds; write paths bump versions so this only bounds memory
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -136,23 +170,77 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 ALLOWED_HOSTS = ['*']
 CORS_ALLOW_ALL_ORIGINS = True
+CORS_EXPOSE_HEADERS = ['X-Next-Cursor', 'Link']
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        'core.authentication.ClaimsJWTAuthentication',
+    ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
+# 📦 MessagePack (Accept: application/msgpack) for the mobile client, when msgpack is installed
+if importlib.util.find_spec('msgpack'):
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] += ('core.renderers.MessagePackRenderer',)
+
+# 🗜️ Response compression (core.compression): brotli when installed, else gzip
+COMPRESSION_MIN_BYTES = 1024
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
+
+# 🎫 How long a user's active flag is trusted before ClaimsJWTAuthentication re-reads it
+AUTH_ACTIVE_CACHE_SECONDS = 30
+
 AUTH_USER_MODEL = 'core.CustomUser'
 
+# ⚡ Serve the hot read endpoints from core.async_views; asgi.py turns this on
+ASYNC_READ_VIEWS = os.environ.get('ASYNC_READ_VIEWS') == '1'
+
+# 📍 Nearby bag search (core.geo)
+NEARBY_INDEX_CELL_DEGREES = 0.05      # ~5.5 km grid cells
+NEARBY_INDEX_REFRESH_SECONDS = 300    # full rebuild so other workers' moves show up
+NEARBY_DEFAULT_K = 20
+NEARBY_MAX_K = 100
+
+# 📦 Vendor bulk bag API
+BULK_BAGS_MAX_ITEMS = 500
+
+# 🔢 Dashboard counters (core.counters): rows per key, picked at random on write
+COUNTER_SHARDS = 8
+
+# 📄 Keyset pagination (core.pagination)
+PAGINATION_DEFAULT_PAGE_SIZE = 50
+PAGINATION_MAX_PAGE_SIZE = 200
+
+# 🔑 Processes that run password hashing for login/registration (0 = hash in the request thread)
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 0))
+PASSWORD_HASH_TIMEOUT = 10  # seconds a request waits for the pool
+
 AUTHENTICATION_BACKENDS = [
+    # Subclasses ModelBackend and also matches usernames, so a failed login is looked up and hashed once
     'core.authentication.EmailOrUsernameBackend',
-    'django.contrib.auth.backends.ModelBackend',
 ]
 
 
 DEFAULT_FILE_STORAGE = 'cloudinary_storage.storage.MediaCloudinaryStorage'
 
+# 🖼️ Vendor/NGO logos (core.images); core.images.LocalLogoStorage keeps them on disk for tests
+LOGO_STORAGE = os.environ.get('LOGO_STORAGE', 'core.images.CloudinaryLogoStorage')
+LOGO_LOCAL_ROOT = BASE_DIR / 'media'
+LOGO_LOCAL_URL = os.environ.get('LOGO_LOCAL_URL', 'http://localhost:8000/media/')
+
+# 🖼️ Background logo uploads (core.logo_uploads)
+LOGO_STAGING_DIR = os.environ.get('LOGO_STAGING_DIR', str(BASE_DIR / 'logo_staging'))
+LOGO_MAX_DIMENSION = 1200             # px, longest side after re-encoding
+LOGO_UPLOAD_MAX_ATTEMPTS = 5
+LOGO_UPLOAD_RETRY_SECONDS = 10        # doubled after every failed attempt
+LOGO_UPLOAD_STALE_SECONDS = 300       # 'processing' longer than this means the worker died
+LOGO_UPLOAD_POLL_SECONDS = 5
+LOGO_UPLOAD_IN_PROCESS_WORKER = True  # False when `manage.py process_logo_uploads --loop` runs instead
+
 MEDIA_URL = ''
 
 CLOUDINARY_STORAGE = {
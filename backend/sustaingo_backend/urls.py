@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
@@ -12,11 +13,11 @@ from core.views import (
     get_vendors, get_vendor_profile, update_vendor_profile,
     get_vendor_my_bags, get_vendor_dashboard_summary,
     get_vendor_reservations, get_vendor_reviews,
-    create_vendor_profile,
+    create_vendor_profile, get_logo_upload,
 
     # 🛍️ Mystery Bags
-    get_all_mystery_bags, get_mystery_bags_by_vendor,
-    create_mystery_bag, update_mystery_bag, delete_mystery_bag,
+    get_all_mystery_bags, get_nearby_bags, get_mystery_bags_by_vendor,
+    create_mystery_bag, update_mystery_bag, delete_mystery_bag, bulk_mystery_bags,
 
     # 📦 Reservations
     reserve_bag, get_my_reservations, mark_reservation_collected,
@@ -34,16 +35,22 @@ from core.views import (
     admin_get_all_bags, admin_get_bag_details,
 
     # 🧑‍💼 Admin Stats
-    get_admin_dashboard_stats,
+    get_admin_dashboard_stats, get_cache_stats,
     list_users, toggle_user_active, delete_user,
     list_reviews, delete_review,
     list_bags, delete_bag, toggle_bag_active,
-    list_reservations, delete_reservation,
+    list_reservations, delete_reservation, export_dataset,
     vendor_analytics,
     reservation_analytics,
     bag_analytics, review_analytics,user_analytics,
 )
 
+# ⚡ Under ASGI the hottest reads are served by their async-ORM versions
+if settings.ASYNC_READ_VIEWS:
+    from core.async_views import (
+        get_vendors, get_all_mystery_bags, get_my_reservations, get_reviews_by_vendor, public_ngos,
+    )
+
 
 urlpatterns = [
     # 🔐 Auth & Profile
@@ -66,12 +73,15 @@ urlpatterns = [
     path('api/vendor-private/bags/', get_vendor_private_bags),
     path('api/vendor-private/bags/<int:bag_id>/update/', update_private_mystery_bag),
     path('api/create_vendor_profile/', create_vendor_profile),
+    path('api/logo-uploads/<int:upload_id>/', get_logo_upload),
 
 
     # 🛍️ Mystery Bags
     path('api/bags/', get_all_mystery_bags),
+    path('api/bags/nearby/', get_nearby_bags),
     path('api/vendors/<int:vendor_id>/bags/', get_mystery_bags_by_vendor),
     path('api/bags/create/', create_mystery_bag),
+    path('api/bags/bulk/', bulk_mystery_bags),
     path('api/bags/<int:bag_id>/update/', update_mystery_bag),
     path('api/bags/<int:bag_id>/delete/', delete_mystery_bag),
 
@@ -95,6 +105,7 @@ urlpatterns = [
 
     # 🧑‍💼 Admin APIs
     path('api/admin-dashboard-stats/', get_admin_dashboard_stats),
+    path('api/admin/cache-stats/', get_cache_stats),
     path('api/admin/users/', list_users),
     path('api/admin/user/<int:user_id>/toggle-active/', toggle_user_active),
     path('api/admin/user/<int:user_id>/delete/', delete_user),
@@ -105,6 +116,7 @@ urlpatterns = [
     path('api/admin/bag/<int:bag_id>/toggle-active/', toggle_bag_active),
     path('api/admin/reservations/', list_reservations),
     path('api/admin/reservation/<int:reservation_id>/delete/', delete_reservation),
+    path('api/admin/export/<str:dataset>/', export_dataset),
     path('api/vendor-analytics/', vendor_analytics),
     path('api/reservation-analytics/', reservation_analytics),
     path('api/bag-analytics/', bag_analytics),
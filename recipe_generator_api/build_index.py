@@ -0,0 +1,168 @@
+"""
+Offline build of everything semantic_api.py loads from data/recipes.csv:
+the columnar recipe store (recipe_store.py), the embeddings and the IVF index.
+
+    python build_index.py                       # store, embeddings and index
+    python build_index.py --reuse-vectors       # rebuild the index from data/recipe_vectors.npy
+    python build_index.py --reuse-vectors --evaluate 500 --skip-build
+    python build_index.py --from-pickle data/vector_db.pkl   # no encoding, see convert_pickle()
+
+--evaluate prints recall@10 against exact search, plus the per-query latency
+for a range of nprobe values. Use it to pick IVF_NPROBE.
+
+Production is exact-only for now. The deploy (.render.yaml) runs only
+`--from-pickle --no-index`, so the service brute-forces the ~2000 float32
+vectors in vector_db.pkl and never loads an IVF, float16 or int8 index. Serving
+the full dataset needs a plain `python build_index.py` run offline (it encodes
+every recipe) and its data/recipe_store, data/recipe_vectors.npy and
+data/ivf_index shipped with the release; no release step produces them yet.
+"""
+import argparse
+import ast
+import csv
+import sys
+import time
+
+import numpy as np
+
+import recipe_store
+import vector_index
+
+MODEL_NAME = "paraphrase-MiniLM-L3-v2"
+
+
+def read_recipes(csv_path, limit=None):
+    """`(names, ingredient_lists)` from the recipes CSV, ingredients parsed once here."""
+    csv.field_size_limit(sys.maxsize)
+    names, ingredient_lists = [], []
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if limit is not None and len(names) >= limit:
+                break
+            names.append(row["name"])
+            ingredient_lists.append([str(i) for i in ast.literal_eval(row["ingredients"])])
+    return names, ingredient_lists
+
+
+def encode_recipes(ingredient_lists, model_name, batch_size):
+    from sentence_transformers import SentenceTransformer
+
+    # Same shape as the query text semantic_api.py builds from ?ingredients=
+    texts = [", ".join(ings) for ings in ingredient_lists]
+    print(f"🔄 Encoding {len(texts)} recipes...")
+    model = SentenceTransformer(model_name)
+    vectors = model.encode(texts, batch_size=batch_size, normalize_embeddings=True,
+                           convert_to_numpy=True, show_progress_bar=True)
+    return vectors.astype(np.float32)
+
+
+def convert_pickle(pickle_path, csv_path, store_dir, vectors_path):
+    """
+    Write the store and vectors from the legacy vector_db.pkl ({"texts", "vectors"}, a torch
+    tensor) without running the model. Its vectors are the first len(vectors) recipes of the
+    CSV, which is how the API used to pair them.
+    """
+    import pickle
+
+    with open(pickle_path, "rb") as f:
+        vectors = pickle.load(f)["vectors"]
+    if hasattr(vectors, "cpu"):
+        vectors = vectors.cpu().numpy()
+    vectors = np.asarray(vectors, dtype=np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    names, ingredient_lists = read_recipes(csv_path, limit=len(vectors))
+    recipe_store.write_store(store_dir, names, ingredient_lists)
+    np.save(vectors_path, vectors)
+    print(f"✅ Converted {pickle_path}: {len(names)} recipes -> {store_dir}, {vectors.shape} vectors -> {vectors_path}")
+    return vectors
+
+
+def sample_queries(vectors, n_queries, seed=1):
+    """Perturbed recipe vectors, standing in for user queries."""
+    rng = np.random.default_rng(seed)
+    queries = np.asarray(vectors[rng.choice(len(vectors), n_queries, replace=False)], dtype=np.float32)
+    queries = queries + rng.normal(scale=0.05, size=queries.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def measure(search, queries, truth=None, k=10):
+    """`(recall@k, mean ms, p99 ms, ids)` of `search(query_batch, k)` run one query at a time."""
+    found, timings = [], []
+    for q in queries:
+        start = time.perf_counter()
+        found.append(search(q[None, :], k)[1][0])
+        timings.append((time.perf_counter() - start) * 1000)
+    recall = 1.0 if truth is None else sum(
+        len(set(t) & set(f)) for t, f in zip(truth, found)) / (k * len(queries))
+    return recall, float(np.mean(timings)), float(np.percentile(timings, 99)), found
+
+
+def evaluate(index, vectors, n_queries, k=10):
+    queries = sample_queries(vectors, n_queries)
+    _, mean_ms, p99_ms, truth = measure(vector_index.ExactIndex(vectors).search, queries, k=k)
+    print(f"\n{'index':<14} {'recall@' + str(k):>10} {'mean ms':>9} {'p99 ms':>8}")
+    print(f"{'exact':<14} {1.0:>10.3f} {mean_ms:>9.2f} {p99_ms:>8.2f}")
+
+    nprobe = 1
+    while nprobe <= index.n_lists:
+        recall, mean_ms, p99_ms, _ = measure(
+            lambda q, k: index.search(q, k, nprobe=nprobe), queries, truth, k)
+        print(f"{'ivf nprobe=' + str(nprobe):<14} {recall:>10.3f} {mean_ms:>9.2f} {p99_ms:>8.2f}")
+        nprobe *= 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", default="data/recipes.csv")
+    parser.add_argument("--store-dir", default="data/recipe_store")
+    parser.add_argument("--vectors", default="data/recipe_vectors.npy")
+    parser.add_argument("--index-dir", default="data/ivf_index")
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--reuse-vectors", action="store_true",
+                        help="Keep the existing store and --vectors; only rebuild the index")
+    parser.add_argument("--from-pickle", metavar="PATH",
+                        help="Take the vectors from a legacy vector_db.pkl instead of encoding")
+    parser.add_argument("--n-lists", type=int, help="IVF clusters (default 4 * sqrt(n))")
+    parser.add_argument("--iterations", type=int, default=15, help="k-means iterations")
+    parser.add_argument("--nprobe", type=int, default=16, help="Default clusters scanned per query")
+    parser.add_argument("--dtype", choices=vector_index.DTYPES, default="float32",
+                        help="Storage for the indexed vectors (see measure_quantization.py)")
+    parser.add_argument("--skip-build", action="store_true", help="Load the existing index (for --evaluate)")
+    parser.add_argument("--no-index", action="store_true",
+                        help="Stop after the store and vectors; semantic_api.py then searches exactly")
+    parser.add_argument("--evaluate", type=int, default=0, metavar="N", help="Measure recall/latency with N queries")
+    args = parser.parse_args()
+
+    if args.reuse_vectors:
+        vectors = np.load(args.vectors)
+    elif args.from_pickle:
+        vectors = convert_pickle(args.from_pickle, args.csv, args.store_dir, args.vectors)
+    else:
+        names, ingredient_lists = read_recipes(args.csv)
+        recipe_store.write_store(args.store_dir, names, ingredient_lists)
+        print(f"✅ Wrote {len(names)} recipes to {args.store_dir}")
+        vectors = encode_recipes(ingredient_lists, args.model, args.batch_size)
+        np.save(args.vectors, vectors)
+        print(f"✅ Saved {vectors.shape} vectors to {args.vectors}")
+
+    if args.no_index:
+        return
+    if args.skip_build:
+        index = vector_index.load(args.index_dir, mmap=False)
+    else:
+        start = time.perf_counter()
+        index = vector_index.build_ivf(vectors, n_lists=args.n_lists, iterations=args.iterations,
+                                       nprobe=args.nprobe, dtype=args.dtype)
+        vector_index.save(index, args.index_dir)
+        print(f"✅ {args.dtype} IVF index with {index.n_lists} lists built in "
+              f"{time.perf_counter() - start:.1f}s -> {args.index_dir}")
+
+    if args.evaluate:
+        index.rerank_vectors = vectors
+        evaluate(index, vectors, args.evaluate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Throughput of /semantic_recommend at increasing concurrency, to check that
+micro-batching (BATCH_MAX_SIZE / BATCH_MAX_WAIT_MS) keeps it scaling.
+
+    uvicorn semantic_api:app &
+    python load_test.py --concurrency 1 8 32 64
+
+Queries are random ingredient combinations, so few of them hit the result
+cache; run with RESULT_CACHE_SIZE=0 EMBEDDING_CACHE_SIZE=0 to measure the
+model alone.
+"""
+import argparse
+import json
+import random
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+INGREDIENTS = [
+    "chicken", "rice", "garlic", "onion", "tomato", "potato", "carrot", "beef", "pasta", "cheese",
+    "egg", "milk", "butter", "flour", "sugar", "lemon", "spinach", "mushroom", "pepper", "ginger",
+    "coconut milk", "chickpea", "lentil", "tofu", "salmon", "shrimp", "basil", "cumin", "yogurt", "honey",
+]
+
+
+def query(url, rng):
+    ingredients = ", ".join(rng.sample(INGREDIENTS, rng.randint(2, 5)))
+    start = time.perf_counter()
+    with urllib.request.urlopen(f"{url}/semantic_recommend?{urllib.parse.urlencode({'ingredients': ingredients})}") as r:
+        r.read()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level")
+    args = parser.parse_args()
+
+    print(f"{'concurrency':>11} {'req/s':>8} {'mean ms':>9} {'p99 ms':>8}")
+    for concurrency in args.concurrency:
+        rngs = [random.Random(concurrency * 1_000_000 + i) for i in range(args.requests)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            latencies = sorted(pool.map(lambda rng: query(args.url, rng), rngs))
+        elapsed = time.perf_counter() - start
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"{concurrency:>11} {args.requests / elapsed:>8.1f} {sum(latencies) / len(latencies):>9.1f} {p99:>8.1f}")
+
+    with urllib.request.urlopen(f"{args.url}/batch_stats") as r:
+        print("\n📊 Batching:", json.loads(r.read()))
+
+
+if __name__ == "__main__":
+    main()
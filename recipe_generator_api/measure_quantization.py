@@ -0,0 +1,67 @@
+"""
+Memory, latency and recall@10 of the recipe embeddings stored as float32,
+float16 and int8, against full-precision exact search.
+
+    python measure_quantization.py
+    python measure_quantization.py --queries 1000 --nprobe 8 --rerank-depth 100
+
+Each dtype is measured with brute force and with the IVF index (clustered
+once, then the grouped vectors quantised), with and without the float32
+re-rank. "recipes / 100MB" is how many embeddings that storage fits; the
+re-rank vectors are memory-mapped and only the candidates' pages are read.
+"""
+import argparse
+
+import numpy as np
+
+import vector_index
+from build_index import measure, sample_queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", default="data/recipe_vectors.npy")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--n-lists", type=int, help="IVF clusters (default 4 * sqrt(n))")
+    parser.add_argument("--nprobe", type=int, default=16)
+    parser.add_argument("--rerank-depth", type=int, default=40, help="Candidates re-scored in float32")
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args()
+
+    vectors = np.load(args.vectors)
+    rerank_vectors = np.load(args.vectors, mmap_mode="r")
+    queries = sample_queries(vectors, args.queries)
+    print(f"📦 {vectors.shape[0]} vectors of dim {vectors.shape[1]}, {args.queries} queries")
+
+    _, base_ms, base_p99, truth = measure(vector_index.ExactIndex(vectors).search, queries, k=args.k)
+    print("🔄 Clustering...")
+    ivf = vector_index.build_ivf(vectors, n_lists=args.n_lists, nprobe=args.nprobe)
+
+    header = f"{'index':<7} {'dtype':<8} {'rerank':>6} {'MB':>8} {'recipes / 100MB':>16} " \
+             f"{'mean ms':>8} {'p99 ms':>8} {'recall@' + str(args.k):>10}"
+    print("\n" + header)
+    print("-" * len(header))
+
+    def report(index, rerank):
+        index.rerank_vectors = rerank_vectors if rerank else None
+        index.rerank_depth = args.rerank_depth
+        recall, mean_ms, p99_ms, _ = measure(index.search, queries, truth, args.k)
+        mb = index.nbytes / 2**20
+        per_100mb = int(100 * 2**20 / (index.nbytes / len(index)))
+        print(f"{index.kind:<7} {index.dtype:<8} {'yes' if rerank else 'no':>6} {mb:>8.1f} {per_100mb:>16,} "
+              f"{mean_ms:>8.2f} {p99_ms:>8.2f} {recall:>10.3f}")
+
+    for dtype in vector_index.DTYPES:
+        codes, scales = vector_index.quantize(vectors, dtype)
+        exact = vector_index.ExactIndex(codes, scales)
+        codes, scales = vector_index.quantize(ivf.vectors, dtype)
+        clustered = vector_index.IVFIndex(ivf.centroids, ivf.offsets, ivf.ids, codes, scales, nprobe=args.nprobe)
+        for index in (exact, clustered):
+            for rerank in ((False,) if dtype == "float32" else (False, True)):
+                report(index, rerank)
+
+    print(f"\n✅ Baseline: float32 exact, {base_ms:.2f} ms mean, {base_p99:.2f} ms p99")
+
+
+if __name__ == "__main__":
+    main()
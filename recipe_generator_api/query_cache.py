@@ -0,0 +1,98 @@
+"""
+Caches for /semantic_recommend, keyed on the canonical ingredient set.
+
+"Rice, Chicken", "chicken,rice" and "chicken, rice, rice" are the same query,
+so they share one entry: ingredients are lower-cased, trimmed, de-duplicated,
+sorted and have simple English plurals folded ("tomatoes" -> "tomato").
+Only the keys are canonicalised; the model encodes `query_text()`, which is
+what the endpoint has always embedded.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+def _singular(word):
+    if len(word) <= 3 or word.endswith(("ss", "us", "is")):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("oes", "ches", "shes", "xes", "zes")):
+        return word[:-2]
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+def query_text(text):
+    """The text the model encodes: the user's ingredients lower-cased and trimmed, in their order."""
+    return ", ".join(ing.strip().lower() for ing in text.split(",") if ing.strip())
+
+
+def canonical_ingredients(text):
+    """Sorted tuple of distinct, normalised ingredients from a comma-separated string."""
+    ingredients = set()
+    for ing in text.split(","):
+        words = ing.strip().lower().split()
+        if words:
+            # Only the head noun is plural: "green beans" -> "green bean"
+            ingredients.add(" ".join(words[:-1] + [_singular(words[-1])]))
+    return tuple(sorted(ingredients))
+
+
+class LRUCache:
+    """
+    Thread-safe LRU map holding at most `maxsize` entries. When `ttl` is set,
+    entries older than `ttl` seconds count as misses and are dropped.
+    """
+
+    def __init__(self, maxsize, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (stored_at, value), least recently used first
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and self.ttl and time.monotonic() - entry[0] > self.ttl:
+                del self._data[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
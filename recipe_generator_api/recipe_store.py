@@ -0,0 +1,79 @@
+"""
+Columnar, memory-mapped recipe metadata written offline by build_index.py.
+
+Each column is a few raw `.npy` arrays opened with `mmap_mode="r"`. Startup
+therefore only maps files; pages are read when a result needs them.
+
+    names.offsets.npy / names.data.npy               UTF-8 names, row i = data[off[i]:off[i + 1]]
+    vocab.offsets.npy / vocab.data.npy               distinct ingredient strings
+    ingredients.offsets.npy / ingredients.ids.npy    each recipe's ingredients as vocab ids
+"""
+import os
+
+import numpy as np
+
+
+class StringColumn:
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+    @classmethod
+    def build(cls, strings):
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return cls(offsets, np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+
+class RecipeStore:
+    def __init__(self, directory):
+        def column(name):
+            return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+
+        self.names = StringColumn(column("names.offsets"), column("names.data"))
+        self.vocab = StringColumn(column("vocab.offsets"), column("vocab.data"))
+        self.ingredient_offsets = column("ingredients.offsets")
+        self.ingredient_ids = column("ingredients.ids")
+        self._vocab_cache = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def ingredients(self, i):
+        ids = self.ingredient_ids[self.ingredient_offsets[i]:self.ingredient_offsets[i + 1]]
+        return [self._ingredient(int(v)) for v in ids]
+
+    def _ingredient(self, vocab_id):
+        # The vocabulary is small and shared by every recipe, so decoded strings are kept
+        name = self._vocab_cache.get(vocab_id)
+        if name is None:
+            name = self._vocab_cache[vocab_id] = self.vocab[vocab_id]
+        return name
+
+    def record(self, i):
+        return {"name": self.names[i], "ingredients": self.ingredients(i)}
+
+
+def write_store(directory, names, ingredient_lists):
+    """Write the columns for `names[i]` / `ingredient_lists[i]` (a list of strings) per recipe."""
+    os.makedirs(directory, exist_ok=True)
+    vocab_ids = {}
+    ids, offsets = [], [0]
+    for ingredients in ingredient_lists:
+        for ingredient in ingredients:
+            ids.append(vocab_ids.setdefault(ingredient, len(vocab_ids)))
+        offsets.append(len(ids))
+
+    columns = {"names": StringColumn.build(names), "vocab": StringColumn.build(list(vocab_ids))}
+    for name, col in columns.items():
+        np.save(os.path.join(directory, f"{name}.offsets.npy"), col.offsets)
+        np.save(os.path.join(directory, f"{name}.data.npy"), col.data)
+    np.save(os.path.join(directory, "ingredients.offsets.npy"), np.asarray(offsets, dtype=np.int64))
+    np.save(os.path.join(directory, "ingredients.ids.npy"), np.asarray(ids, dtype=np.int32))
@@ -1,11 +1,16 @@
 from fastapi import FastAPI, Query
 from typing import List
-import pandas as pd
-import torch
-from sentence_transformers import SentenceTransformer, util
-import pickle
+import os
+import numpy as np
+from sentence_transformers import SentenceTransformer
 from fastapi.middleware.cors import CORSMiddleware
 
+import build_index
+import query_batcher
+import query_cache
+import recipe_store
+import vector_index
+
 app = FastAPI()
 
 # Allow CORS for frontend integration
@@ -17,40 +22,103 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Load a reduced dataset to fit Render free tier memory
-print("🔄 Loading dataset...")
-df = pd.read_csv("data/recipes.csv").head(2000)  # Load only top 2000 for now
-print("✅ Dataset loaded: ", len(df), "recipes")
+# All built offline by build_index.py and memory-mapped here, so startup reads almost nothing
+STORE_DIR = os.environ.get("RECIPE_STORE_DIR", "data/recipe_store")
+VECTORS_PATH = os.environ.get("RECIPE_VECTORS", "data/recipe_vectors.npy")
+INDEX_DIR = os.environ.get("VECTOR_INDEX_DIR", "data/ivf_index")
+INDEX_KIND = os.environ.get("VECTOR_INDEX", "ivf")  # "exact" forces brute force
+RECIPES_CSV = os.environ.get("RECIPES_CSV", "data/recipes.csv")
+LEGACY_PICKLE = os.environ.get("RECIPE_VECTOR_PICKLE", "data/vector_db.pkl")
+IVF_NPROBE = int(os.environ.get("IVF_NPROBE", 0)) or None  # None = the value stored with the index
+RERANK_DEPTH = int(os.environ.get("RERANK_DEPTH", 40))  # float16/int8 index: candidates re-scored in float32, 0 = off
 
-model = SentenceTransformer("paraphrase-MiniLM-L3-v2")
+# Embeddings never go stale; results only change when the index is rebuilt (and the API restarted)
+embedding_cache = query_cache.LRUCache(
+    int(os.environ.get("EMBEDDING_CACHE_SIZE", 10000)), float(os.environ.get("EMBEDDING_CACHE_TTL", 0)) or None
+)
+result_cache = query_cache.LRUCache(
+    int(os.environ.get("RESULT_CACHE_SIZE", 2000)), float(os.environ.get("RESULT_CACHE_TTL", 600)) or None
+)
+
+# No build_index.py run yet (e.g. a fresh deploy): convert the shipped vector_db.pkl once
+if not (os.path.exists(os.path.join(STORE_DIR, "names.offsets.npy")) and os.path.exists(VECTORS_PATH)):
+    print("🔄 No recipe store yet, converting", LEGACY_PICKLE)
+    build_index.convert_pickle(LEGACY_PICKLE, RECIPES_CSV, STORE_DIR, VECTORS_PATH)
+
+print("🔄 Loading recipe store...")
+store = recipe_store.RecipeStore(STORE_DIR)
+print("✅ Recipe store mapped: ", len(store), "recipes")
 
-# Load the reduced vector DB
 print("📦 Loading recipe vectors...")
-with open("data/vector_db.pkl", "rb") as f:
-    vector_db = pickle.load(f)
+if INDEX_KIND == "ivf" and os.path.exists(os.path.join(INDEX_DIR, "meta.json")):
+    index = vector_index.load(INDEX_DIR, nprobe=IVF_NPROBE)
+    if index.dtype != "float32" and RERANK_DEPTH and os.path.exists(VECTORS_PATH):
+        index.rerank_vectors = np.load(VECTORS_PATH, mmap_mode="r")
+        index.rerank_depth = RERANK_DEPTH
+    print(f"✅ {index.dtype} IVF index loaded: {len(index)} vectors, {index.n_lists} lists, nprobe={index.nprobe}, "
+          f"rerank={'top ' + str(index.rerank_depth) if index.rerank_vectors is not None else 'off'}")
+else:
+    index = vector_index.ExactIndex(np.load(VECTORS_PATH, mmap_mode="r"))
+    print("✅ Exact search over vectors with shape:", index.vectors.shape)
+
+if len(index) != len(store):
+    raise RuntimeError(f"{len(index)} vectors for {len(store)} recipes; rerun build_index.py")
+
+model = SentenceTransformer("paraphrase-MiniLM-L3-v2")
+
+def _recommend_batch(queries):
+    """Top-10 recipes for each `(cache key, query text)`: one encode and one search for the batch."""
+    keys = [key for key, _ in queries]
+    texts = {}
+    for key, text in queries:
+        texts.setdefault(key, text)
+    embeddings = {key: embedding_cache.get(key) for key in texts}
+    missing = [key for key, emb in embeddings.items() if emb is None]
+    if missing:
+        encoded = model.encode(
+            [texts[key] for key in missing], convert_to_numpy=True, normalize_embeddings=True
+        ).astype(np.float32)
+        for key, emb in zip(missing, encoded):
+            embedding_cache.set(key, emb)
+            embeddings[key] = emb
+
+    scores, top_indices = index.search(np.stack([embeddings[key] for key in keys]), k=10)
+
+    batch_results = []
+    for key, row_ids, row_scores in zip(keys, top_indices.tolist(), scores.tolist()):
+        results = [{**store.record(idx), "score": round(score, 3)}
+                   for idx, score in zip(row_ids, row_scores) if idx >= 0]
+        result_cache.set(key, results)
+        batch_results.append(results)
+    return batch_results
+
+
+# Concurrent queries are encoded and searched together
+batcher = query_batcher.MicroBatcher(
+    _recommend_batch,
+    max_batch_size=int(os.environ.get("BATCH_MAX_SIZE", 32)),
+    max_wait_ms=float(os.environ.get("BATCH_MAX_WAIT_MS", 5)),
+)
 
-recipe_vectors = vector_db["vectors"]
-print("✅ Vector DB loaded with shape:", recipe_vectors.shape)
 
 @app.get("/semantic_recommend")
-def recommend_semantic(ingredients: str = Query(...)):
-    user_ings = [ing.strip().lower() for ing in ingredients.split(",") if ing.strip()]
+async def recommend_semantic(ingredients: str = Query(...)):
+    # Cached by ingredient set, but the model sees the ingredients as the user typed them
+    user_ings = query_cache.canonical_ingredients(ingredients)
     if not user_ings:
         return {"error": "Please provide ingredients."}
 
-    user_embedding = model.encode(
-        ", ".join(user_ings), convert_to_tensor=True, normalize_embeddings=True
-    )
+    cached = result_cache.get(user_ings)
+    if cached is not None:
+        return cached
+    return await batcher.submit((user_ings, query_cache.query_text(ingredients)))
+
 
-    scores = util.cos_sim(user_embedding, recipe_vectors)[0]
-    top_indices = torch.topk(scores, k=10).indices.tolist()
+@app.get("/cache_stats")
+def cache_stats():
+    return {"embedding": embedding_cache.stats(), "result": result_cache.stats()}
 
-    results = []
-    for idx in top_indices:
-        results.append({
-            "name": df.iloc[idx]["name"],
-            "ingredients": eval(df.iloc[idx]["ingredients"]),
-            "score": round(float(scores[idx]), 3),
-        })
 
-    return results
+@app.get("/batch_stats")
+def batch_stats():
+    return batcher.stats()
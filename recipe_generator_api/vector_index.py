@@ -0,0 +1,228 @@
+"""
+Nearest-neighbour search over the recipe embeddings.
+
+All vectors are L2-normalised, so the inner product is the cosine similarity.
+
+- ExactIndex scans every vector. It is the reference and the fallback.
+- IVFIndex is an inverted-file index. Offline, k-means splits the vectors into
+  `n_lists` clusters. A query scores only the `nprobe` clusters whose centroids
+  are closest, so `nprobe` trades recall for latency.
+
+Both take a batch of queries of shape (m, dim) and return `(scores, ids)` of
+shape (m, k), best first.
+
+Vectors can be stored as float32, float16 (half the memory) or int8 with one
+float32 scale per vector (a quarter of the memory). When `rerank_vectors` is
+set (the float32 vectors by recipe id, normally memory-mapped), the best
+`rerank_depth` candidates found on the quantised codes are re-scored exactly.
+numpy converts float16 slowly, so int8 is both smaller and faster to scan.
+"""
+import json
+import os
+
+import numpy as np
+
+DTYPES = ("float32", "float16", "int8")
+
+
+def _top_k(scores, k):
+    """Indices of the k largest entries of each row of `scores`, best first."""
+    k = min(k, scores.shape[1])
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, part, axis=1), axis=1)
+    return np.take_along_axis(part, order, axis=1)
+
+
+def quantize(vectors, dtype):
+    """`(codes, scales)` for `vectors` stored as `dtype`; `scales` is None except for int8."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if dtype == "float32":
+        return vectors, None
+    if dtype == "float16":
+        return vectors.astype(np.float16), None
+    if dtype == "int8":
+        scales = np.maximum(np.abs(vectors).max(axis=1), 1e-12) / 127
+        codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    raise ValueError(f"dtype must be one of {DTYPES}")
+
+
+def _dot(vectors, scales, rows, queries):
+    """Scores of `queries` (m, dim) against `vectors[rows]`, decoded to float32: (m, len(rows))."""
+    block = vectors[rows]
+    if block.dtype != np.float32:
+        block = block.astype(np.float32)
+    scores = queries @ block.T
+    if scales is not None:
+        scores *= scales[rows]
+    return scores
+
+
+class _Index:
+    rerank_vectors = None
+    rerank_depth = 40
+
+    @property
+    def dtype(self):
+        return self.vectors.dtype.name
+
+    @property
+    def nbytes(self):
+        """Memory for the searched vectors (codes plus scales)."""
+        return self.vectors.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def search(self, queries, k=10, **options):
+        if self.rerank_vectors is None or self.dtype == "float32":
+            return self._search(queries, k, **options)
+        _, candidates = self._search(queries, max(k, self.rerank_depth), **options)
+        return _rerank(queries, candidates, self.rerank_vectors, k)
+
+
+def _rerank(queries, candidates, vectors, k):
+    all_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+    all_ids = np.full((len(queries), k), -1, dtype=np.int64)
+    for row, (query, ids) in enumerate(zip(queries, candidates)):
+        ids = np.sort(ids[ids >= 0])  # ascending ids read the mapped file in order
+        if len(ids) == 0:
+            continue
+        scores = np.asarray(vectors[ids], dtype=np.float32) @ query
+        best = _top_k(scores[None, :], k)[0]
+        all_scores[row, :len(best)] = scores[best]
+        all_ids[row, :len(best)] = ids[best]
+    return all_scores, all_ids
+
+
+class ExactIndex(_Index):
+    kind = "exact"
+    chunk = 2048  # decoded rows per step; small enough to stay in cache
+
+    def __init__(self, vectors, scales=None, rerank_vectors=None):
+        self.vectors = vectors
+        self.scales = scales
+        self.rerank_vectors = rerank_vectors
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def _search(self, queries, k):
+        if self.dtype == "float32":
+            scores = queries @ self.vectors.T
+        else:
+            # Decode in chunks so a float32 copy of everything never exists
+            scores = np.concatenate([
+                _dot(self.vectors, self.scales, slice(start, start + self.chunk), queries)
+                for start in range(0, len(self.vectors), self.chunk)
+            ], axis=1)
+        ids = _top_k(scores, k)
+        return np.take_along_axis(scores, ids, axis=1), ids
+
+
+class IVFIndex(_Index):
+    kind = "ivf"
+
+    def __init__(self, centroids, offsets, ids, vectors, scales=None, nprobe=16, rerank_vectors=None):
+        self.centroids = centroids  # (n_lists, dim)
+        self.offsets = offsets      # list i is rows offsets[i]:offsets[i + 1] of `vectors`
+        self.ids = ids              # recipe row id of each of those rows
+        self.vectors = vectors      # the embeddings (or their codes), grouped by list
+        self.scales = scales        # int8 only: per-row scale
+        self.nprobe = nprobe
+        self.rerank_vectors = rerank_vectors
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    def _search(self, queries, k, nprobe=None):
+        nprobe = min(nprobe or self.nprobe, self.n_lists)
+        probes = _top_k(queries @ self.centroids.T, nprobe)
+        all_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        all_ids = np.full((len(queries), k), -1, dtype=np.int64)
+
+        for row, (query, lists) in enumerate(zip(queries, probes)):
+            # Each list is a contiguous slice, so this scores them without gathering rows
+            slices = [slice(self.offsets[i], self.offsets[i + 1]) for i in lists]
+            scores = np.concatenate([_dot(self.vectors, self.scales, s, query[None, :])[0] for s in slices])
+            if len(scores) == 0:
+                continue
+            rows = np.concatenate([np.arange(s.start, s.stop) for s in slices])
+            best = _top_k(scores[None, :], k)[0]
+            all_scores[row, :len(best)] = scores[best]
+            all_ids[row, :len(best)] = self.ids[rows[best]]
+        return all_scores, all_ids
+
+
+# 🏗️ Building (offline)
+
+def _assign(vectors, centroids, chunk=8192):
+    """Nearest centroid for every vector, in chunks to bound memory."""
+    out = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), chunk):
+        out[start:start + chunk] = np.argmax(vectors[start:start + chunk] @ centroids.T, axis=1)
+    return out
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def build_ivf(vectors, n_lists=None, iterations=15, sample_size=100_000, nprobe=16, dtype="float32", seed=0):
+    """Spherical k-means on a sample of `vectors`, then every vector filed under its nearest centroid."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    n_lists = n_lists or max(1, int(4 * np.sqrt(len(vectors))))
+    n_lists = min(n_lists, len(vectors))
+
+    sample = vectors[rng.choice(len(vectors), min(sample_size, len(vectors)), replace=False)]
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = _assign(sample, centroids)
+        counts = np.bincount(assignment, minlength=n_lists)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        empty = counts == 0
+        # Re-seed empty clusters with random sample points
+        sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+        centroids = _normalize(sums)
+
+    assignment = _assign(vectors, centroids)
+    order = np.argsort(assignment, kind="stable")
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(assignment, minlength=n_lists))]).astype(np.int64)
+    codes, scales = quantize(vectors[order], dtype)
+    return IVFIndex(centroids, offsets, order.astype(np.int64), codes, scales, nprobe=nprobe)
+
+
+# 💾 Saving / loading
+
+IVF_ARRAYS = ("centroids", "offsets", "ids", "vectors", "scales")
+
+
+def save(index, directory):
+    os.makedirs(directory, exist_ok=True)
+    for name in IVF_ARRAYS:
+        path = os.path.join(directory, f"{name}.npy")
+        if getattr(index, name) is not None:
+            np.save(path, getattr(index, name))
+        elif os.path.exists(path):
+            os.remove(path)  # e.g. int8 scales left by a previous build
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump({"kind": index.kind, "count": len(index), "n_lists": index.n_lists, "dtype": index.dtype,
+                   "dim": int(index.vectors.shape[1]), "nprobe": index.nprobe}, f)
+
+
+def load(directory, nprobe=None, mmap=True, rerank_vectors=None):
+    """
+    Load an index written by `save()`. The vectors are memory-mapped unless
+    `mmap=False`. Pass `rerank_vectors` to re-score quantised results in float32.
+    """
+    with open(os.path.join(directory, "meta.json")) as f:
+        meta = json.load(f)
+    arrays = {}
+    for name in IVF_ARRAYS:
+        path = os.path.join(directory, f"{name}.npy")
+        arrays[name] = np.load(path, mmap_mode="r" if mmap and name == "vectors" else None) if os.path.exists(path) else None
+    return IVFIndex(**arrays, nprobe=nprobe or meta["nprobe"], rerank_vectors=rerank_vectors)